@@ -1,12 +1,174 @@
-from typing import Type, Any, TypeVar, Callable, cast
+import inspect
+from inspect import Parameter
+from functools import partial
+from itertools import repeat
+from keyword import iskeyword
+from typing import Type, Any, TypeVar, Callable, Iterable, cast, get_origin
 
 from .factory import Factory
+from .lazy import LazyProxy
 from .markers import Nested, Dynamic
 from .simplifiers import ObjectSimplifier, Simplifier
 from .typing import Attrs
 
 T = TypeVar('T')
 
+#: A callable that resolves a :func:`~chide.nest` marker to a sample object.
+Nest = Callable[[Nested[Any]], Any]
+
+
+class Plan:
+    """
+    The compiled form of the sample attributes for one type in a :class:`Collection`.
+
+    Static values are copied as a whole, so only the keys holding :func:`~chide.nest`
+    or :func:`~chide.call` markers need to be visited each time a sample is made.
+
+    If ``compiled`` is true, a function specialised for making samples using ``constructor``
+    is generated and used by :meth:`make`. See :class:`Collection` for details.
+    """
+
+    def __init__(self, source: Attrs, constructor: Callable[..., Any], compiled: bool = False) -> None:
+        #: The attributes this plan was compiled from.
+        self.source = source
+        #: The callable used to make samples.
+        self.constructor = constructor
+        #: The keys and markers that must be resolved when a sample is made.
+        self.markers: list[tuple[str, Nested[Any] | Dynamic[Any]]] = [
+            (key, value) for key, value in source.items() if isinstance(value, (Nested, Dynamic))
+        ]
+        if compiled:
+            self._compile()
+
+    @staticmethod
+    def _resolve(marker: Nested[Any] | Dynamic[Any], nest: Nest) -> Any:
+        if isinstance(marker, Nested):
+            if marker.lazy:
+                return LazyProxy(partial(nest, marker))
+            return nest(marker)
+        return marker.factory()
+
+    def attrs(self, attrs: Attrs, nest: Nest) -> Attrs:
+        computed_attrs = dict(self.source)
+        resolve = self._resolve
+        for key, marker in self.markers:
+            if key not in attrs:
+                computed_attrs[key] = resolve(marker, nest)
+        computed_attrs.update(attrs)
+        return computed_attrs
+
+    def some(self, keys: Iterable[str], attrs: Attrs, nest: Nest) -> Attrs:
+        """
+        Compute only the attributes with the specified ``keys``, omitting any that
+        are neither in the sample attributes nor in ``attrs``.
+        """
+        computed_attrs = {}
+        for key in keys:
+            if key in attrs:
+                computed_attrs[key] = attrs[key]
+            elif key in self.source:
+                value = self.source[key]
+                if isinstance(value, (Nested, Dynamic)):
+                    value = self._resolve(value, nest)
+                computed_attrs[key] = value
+        return computed_attrs
+
+    def make(self, attrs: Attrs, nest: Nest) -> Any:
+        return self.constructor(**self.attrs(attrs, nest))
+
+    def _compile(self) -> None:
+        # generic aliases such as Sample[int] have no signature of their own:
+        origin = get_origin(self.constructor)
+        signed = origin if isinstance(origin, type) else self.constructor
+        try:
+            parameters = inspect.signature(signed).parameters
+        except (TypeError, ValueError):
+            # no signature available, such as for many builtins, so use the generic path:
+            return
+
+        keyword_kinds = Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY
+        accepts_any = any(p.kind is Parameter.VAR_KEYWORD for p in parameters.values())
+        unexpected = [
+            key
+            for key in self.source
+            if not accepts_any and (key not in parameters or parameters[key].kind not in keyword_kinds)
+        ]
+        if unexpected:
+            raise TypeError(
+                f'{self.constructor!r} does not accept sample attributes: {", ".join(map(repr, unexpected))}'
+            )
+        if not all(key.isidentifier() and not iskeyword(key) for key in self.source):
+            return
+
+        positional = []
+        for name, parameter in parameters.items():
+            if parameter.kind is not Parameter.POSITIONAL_OR_KEYWORD or name not in self.source:
+                break
+            positional.append(name)
+        keyword = [key for key in self.source if key not in positional]
+
+        namespace: dict[str, Any] = {
+            'constructor': self.constructor,
+            'generic': self.make,
+            'keys': frozenset(self.source),
+            'LazyProxy': LazyProxy,
+            'partial': partial,
+        }
+        default = {}
+        for i, (key, value) in enumerate(self.source.items()):
+            if isinstance(value, Nested):
+                namespace[f'm{i}'] = value
+                default[key] = f'LazyProxy(partial(nest, m{i}))' if value.lazy else f'nest(m{i})'
+            elif isinstance(value, Dynamic):
+                namespace[f'f{i}'] = value.factory
+                default[key] = f'f{i}()'
+            else:
+                namespace[f'v{i}'] = value
+                default[key] = f'v{i}'
+
+        def arguments(overridable: bool) -> str:
+            expressions = {
+                key: f'attrs[{key!r}] if {key!r} in attrs else {default[key]}'
+                if overridable
+                else default[key]
+                for key in self.source
+            }
+            return ', '.join(
+                [expressions[key] for key in positional] + [f'{key}={expressions[key]}' for key in keyword]
+            )
+
+        source = (
+            'def make(attrs, nest):\n'
+            '    if attrs:\n'
+            '        if not keys.issuperset(attrs):\n'
+            '            return generic(attrs, nest)\n'
+            f'        return constructor({arguments(overridable=True)})\n'
+            f'    return constructor({arguments(overridable=False)})\n'
+        )
+        exec(source, namespace)
+        self.make = namespace['make']  # type: ignore[method-assign]
+
+
+class Scope:
+    """
+    The nested sample objects made during one call to :meth:`Collection.make` when
+    the :class:`Collection` shares nested samples. Each type is made at most once,
+    unless it is nested using ``nest(type_, shared=False)``.
+    """
+
+    def __init__(self, collection: 'Collection') -> None:
+        self.collection = collection
+        self.objects: dict[Type[Any], Any] = {}
+
+    def __call__(self, marker: Nested[Any]) -> Any:
+        type_ = marker.type_
+        if not marker.shared:
+            return self.collection._plan(type_).make({}, self)
+        if type_ in self.objects:
+            return self.objects[type_]
+        obj = self.objects[type_] = self.collection._plan(type_).make({}, self)
+        return obj
+
 
 class Collection:
     """
@@ -16,23 +178,68 @@ class Collection:
         A dictionary mapping object types to a dictionary
         of attributes to make a sample object of that type.
 
+    :param compiled:
+        If true, a function specialised for making samples of each type will be
+        generated when that type is registered. This passes sample attributes straight
+        to the constructor's parameters, positionally where possible, instead of merging
+        them into a new :class:`dict` each time. The sample attributes are also checked
+        against the constructor's signature, with a :class:`TypeError` raised for any
+        that it does not accept.
+
+    :param shared:
+        If true, each nested type will be made at most once each time :meth:`make`
+        is called, with that sample object used wherever the type is nested within the
+        object being made. Individual attributes can opt out of this by using
+        ``nest(type_, shared=False)``.
+
+    The attributes for each type are compiled into a :class:`Plan` the first
+    time a sample of that type is made. Replacing the attributes for a type,
+    either using :meth:`add` or by assigning to :attr:`mapping`, causes the
+    plan to be recompiled. If you modify the attributes for a type in place,
+    call :meth:`invalidate` afterwards.
     """
 
-    def __init__(self, mapping: dict[Type[Any], Attrs] | None = None) -> None:
+    def __init__(
+        self, mapping: dict[Type[Any], Attrs] | None = None, compiled: bool = False, shared: bool = False
+    ) -> None:
         self.mapping = mapping or {}
         self.constructors: dict[Type[Any], Type[Any]] = {}
+        self.compiled = compiled
+        self.shared = shared
+        self._plans: dict[Type[Any], Plan] = {}
+        if compiled:
+            for type_ in self.mapping:
+                self._plan(type_)
 
-    def _attrs(self, type_: Type[Any], attrs: Attrs, nest: Callable[[Type[T]], T]) -> Attrs:
-        computed_attrs = dict(self.mapping[type_])
-        for key, value in computed_attrs.items():
-            if key in attrs:
-                continue
-            if isinstance(value, Nested):
-                computed_attrs[key] = nest(value.type_)
-            elif isinstance(value, Dynamic):
-                computed_attrs[key] = value.factory()
-        computed_attrs.update(attrs)
-        return computed_attrs
+    def _plan(self, type_: Type[Any]) -> Plan:
+        source = self.mapping[type_]
+        constructor = self.constructors.get(type_, type_)
+        plan = self._plans.get(type_)
+        if plan is None or plan.source is not source or plan.constructor is not constructor:
+            plan = self._plans[type_] = Plan(source, constructor, self.compiled)
+        return plan
+
+    def _attrs(self, type_: Type[Any], attrs: Attrs, nest: Nest) -> Attrs:
+        return self._plan(type_).attrs(attrs, nest)
+
+    def _nest(self, marker: Nested[Any]) -> Any:
+        return self.make(marker.type_)
+
+    def _nester(self) -> Nest:
+        if self.shared:
+            return Scope(self)
+        return self._nest
+
+    def invalidate(self, type_: Type[Any] | None = None) -> None:
+        """
+        Discard the compiled :class:`Plan` for the specified ``type_`` or, if no type
+        is specified, for all types. This is only needed if the attributes for a type
+        have been modified in place.
+        """
+        if type_ is None:
+            self._plans.clear()
+        else:
+            self._plans.pop(type_, None)
 
     def add(
         self,
@@ -67,6 +274,9 @@ class Collection:
         self.mapping[key] = attrs
         if constructor is not None:
             self.constructors[key] = constructor
+        self.invalidate(key)
+        if self.compiled:
+            self._plan(key)
 
     def attributes(self, type_: Type[T], **attrs: Any) -> Attrs:
         """
@@ -76,7 +286,7 @@ class Collection:
         The ``attrs`` mapping will be overlaid onto the sample attributes
         and returned as a :class:`dict`.
         """
-        return self._attrs(type_, attrs, self.make)
+        return self._attrs(type_, attrs, self._nester())
 
     def make(self, type_: Type[T], override: Type[T] | None = None, /, **attrs: Any) -> T:
         """
@@ -90,8 +300,33 @@ class Collection:
         If ``override`` is provided, it will be used to construct the object in place of the
         supplied type.
         """
-        constructor = cast(Type[T], override or self.constructors.get(type_, type_))
-        return constructor(**self.attributes(type_, **attrs))
+        if override is not None:
+            return override(**self.attributes(type_, **attrs))
+        return cast(T, self._plan(type_).make(attrs, self._nester()))
+
+    def make_many(self, type_: Type[T], n: int, /, **attrs: Any) -> list[T]:
+        """
+        Make ``n`` sample objects of the specified ``type_``, as :meth:`make` would,
+        with the ``attrs`` mapping overlaid onto the sample attributes for each of them.
+
+        The sample attributes and constructor for ``type_`` are only looked up once,
+        making this quicker than calling :meth:`make` in a loop.
+        """
+        return self.make_each(type_, repeat(attrs, n))
+
+    def make_each(self, type_: Type[T], overrides: Iterable[Attrs], /) -> list[T]:
+        """
+        Make a sample object of the specified ``type_`` for each mapping in ``overrides``,
+        as :meth:`make` would, with that mapping overlaid onto the sample attributes.
+
+        The sample attributes and constructor for ``type_`` are only looked up once,
+        making this quicker than calling :meth:`make` in a loop.
+        """
+        make = self._plan(type_).make
+        if self.shared:
+            return [make(attrs, Scope(self)) for attrs in overrides]
+        nest = self._nest
+        return [make(attrs, nest) for attrs in overrides]
 
     def bind(self, type_: Type[T], **attrs: Any) -> Factory[T]:
         """
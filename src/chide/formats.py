@@ -1,16 +1,50 @@
 import builtins
 import csv
+import os
+import pickle
 import re
+import sys
+from abc import abstractmethod
+from array import array
 from ast import literal_eval
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from copy import copy, deepcopy
+from datetime import date, datetime
 from enum import Enum, auto
+from functools import cache, lru_cache
+from hashlib import sha256
+from importlib import import_module
+from importlib.metadata import PackageNotFoundError, version
 from io import StringIO
-from itertools import zip_longest
-from textwrap import dedent
-from typing import Protocol, Iterable, Type, Callable, Any, TypeVar, TypeAlias, Mapping
+from itertools import chain, islice, pairwise, zip_longest
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import (
+    Protocol,
+    Iterable,
+    Iterator,
+    Type,
+    Callable,
+    Any,
+    TypeVar,
+    TypeAlias,
+    Mapping,
+    TextIO,
+    Hashable,
+    Literal,
+    Sequence,
+    SupportsIndex,
+    overload,
+)
 
 from .typing import Attrs
 
 T = TypeVar('T')
+R = TypeVar('R')
+P = TypeVar('P', bound=list[Any])
 
 
 class Format(Protocol):
@@ -44,14 +78,143 @@ TypeNameMapping: TypeAlias = dict[Type[Any], str | None]
 ColumnRenderMapping: TypeAlias = dict[str, ValueRender]
 
 
-def default_parse(text: str) -> Any:
-    """
-    The default :class:`ValueParse`.
-    """
+INT = re.compile(r'-?(?:0|[1-9][0-9]*)')
+FLOAT = re.compile(r'-?(?:(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?|[0-9]+[eE][-+]?[0-9]+)')
+#: Characters that may start or be part of a literal that is not simply a name:
+LITERAL_START = frozenset('0123456789+-.\'"([{')
+LITERAL_PART = re.compile(r'[\'"(\[{#\\,]')
+CONSTANTS = {'None': None, 'True': True, 'False': False}
+CACHEABLE = frozenset((int, float, complex, str, bytes, bool, type(None)))
+_NOT_CACHEABLE = object()
+
+
+def _literal_parse(text: str) -> Any:
     try:
         return literal_eval(text)
-    except SyntaxError:
+    except (SyntaxError, ValueError):
+        return text
+
+
+def _is_text(text: str) -> bool:
+    # a name or plain text, which can only evaluate to itself:
+    return (
+        bool(text)
+        and text[0] not in LITERAL_START
+        and not text[0].isspace()
+        and text.isascii()
+        and not text[-1].isspace()
+        and not LITERAL_PART.search(text)
+    )
+
+
+def _uncached_parse(text: str) -> Any:
+    if not text:
         return text
+    if text in CONSTANTS:
+        return CONSTANTS[text]
+    if _is_text(text):
+        return text
+    if INT.fullmatch(text):
+        return int(text)
+    if FLOAT.fullmatch(text):
+        return float(text)
+    return _literal_parse(text)
+
+
+@lru_cache(maxsize=2**16)
+def _cached_parse(text: str) -> Any:
+    value = _uncached_parse(text)
+    if type(value) in CACHEABLE:
+        return value
+    return _NOT_CACHEABLE
+
+
+def default_parse(text: str) -> Any:
+    """
+    The default :class:`ValueParse`. Text is evaluated as a Python literal, if possible,
+    and returned unchanged otherwise.
+
+    Numbers, ``None``, ``True``, ``False`` and plain text are recognised without
+    evaluating the text and results that cannot be mutated are cached, with
+    :func:`ast.literal_eval` only used for other literals.
+    """
+    value = _cached_parse(text)
+    if value is _NOT_CACHEABLE:
+        return _literal_parse(text)
+    return value
+
+
+DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+DATETIME = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2}[T ][0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]{1,6})?)?(?:Z|[+-][0-9]{2}:[0-9]{2})?'
+)
+#: Cell text treated as missing when inferring the type of a column.
+NULLS = frozenset(('', 'None'))
+BOOLS = frozenset(('True', 'False'))
+
+
+class InferredParse:
+    """
+    A :class:`ValueParse` chosen by inferring the type of a column.
+    Text for which ``match`` returns true is converted using ``convert``, with any other
+    text, or text that ``convert`` raises a :class:`ValueError` for, passed to ``fallback``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        match: Callable[[str], object],
+        convert: ValueParse,
+        fallback: ValueParse = default_parse,
+    ) -> None:
+        self.name = name
+        self.match = match
+        self.convert = convert
+        self.fallback = fallback
+
+    def __call__(self, text: str) -> Any:
+        if self.match(text):
+            try:
+                return self.convert(text)
+            except ValueError:
+                pass
+        return self.fallback(text)
+
+    def __repr__(self) -> str:
+        return f'<InferredParse: {self.name}>'
+
+
+def _is_number(text: str) -> bool:
+    return bool(INT.fullmatch(text) or FLOAT.fullmatch(text))
+
+
+def _is_plain_text(text: str) -> bool:
+    return text not in CONSTANTS and _is_text(text)
+
+
+#: The parsers that may be chosen when inferring the type of a column, in order of preference.
+#: The first one that matches all non-null cells sampled from a column is used.
+INFERRED_PARSERS = [
+    InferredParse('int', INT.fullmatch, int),
+    InferredParse('float', _is_number, float),
+    InferredParse('date', DATE.fullmatch, date.fromisoformat),
+    InferredParse('datetime', DATETIME.fullmatch, datetime.fromisoformat),
+    InferredParse('bool', BOOLS.__contains__, CONSTANTS.__getitem__),
+    InferredParse('str', _is_plain_text, str),
+]
+
+
+def infer_parse(samples: Iterable[str], default: ValueParse = default_parse) -> ValueParse:
+    """
+    Return the first of the :data:`INFERRED_PARSERS` that matches all of the non-null
+    ``samples``, or ``default`` if none of them do or all the samples are null.
+    """
+    texts = [text for text in samples if text not in NULLS]
+    if texts:
+        for parser in INFERRED_PARSERS:
+            if all(parser.match(text) for text in texts):
+                return parser
+    return default
 
 
 NEEDS_REPR = re.compile(r'^(\s.+|.+\s)$')
@@ -80,6 +243,418 @@ HEADER = TypeLocation.HEADER
 #: Shortcut for :any:`TypeLocation.ROW`.
 ROW = TypeLocation.ROW
 
+#: Type of the sources of text that can be parsed: text, a file-like object or a path.
+Source: TypeAlias = str | TextIO | os.PathLike[str]
+
+
+def mapped_lines(path: str | os.PathLike[str], encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Yield the lines of the file at the supplied ``path``, including their line endings,
+    by memory mapping the file and decoding one line at a time.
+    The ``encoding`` must be one, such as UTF-8, where newlines are a single ``\\n`` byte.
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+            readline = mapped.readline
+            while line := readline():
+                yield line.decode(encoding)
+
+
+#: Type of a callable that splits lines of text into the parts for each cell in a row.
+Lexer = Callable[[Iterable[str]], Iterable[Iterable[str]]]
+
+
+class Row(tuple[Any, ...]):
+    """
+    A compact, immutable row of a parsed table. The values are stored in a :class:`tuple`
+    with the column names shared between all rows with the same columns.
+
+    Values can be obtained by column name, or by position, and the :meth:`keys`,
+    :meth:`values`, :meth:`items` and :meth:`get` methods behave as they do for a
+    :class:`dict`, so rows can be passed back to a format for rendering.
+    Unlike a :class:`dict`, iterating over a row, or using ``in`` with one, works on its
+    values, as it does for a :class:`tuple`.
+
+    Rows are only equal to other rows with the same columns and values.
+    """
+
+    __slots__ = ()
+
+    #: The names of the columns of this row.
+    columns: tuple[str, ...] = ()
+    #: A mapping of column name to position in this row.
+    positions: dict[str, int] = {}
+
+    @overload
+    def __getitem__(self, key: SupportsIndex) -> Any: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> tuple[Any, ...]: ...
+
+    @overload
+    def __getitem__(self, key: str) -> Any: ...
+
+    def __getitem__(self, key: SupportsIndex | slice | str) -> Any:
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self.positions[key])
+            except IndexError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self.positions.get(key)
+        if index is None or index >= len(self):
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self) -> tuple[str, ...]:
+        if len(self) == len(self.columns):
+            return self.columns
+        return self.columns[: len(self)]
+
+    def values(self) -> tuple[Any, ...]:
+        return tuple(self)
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return zip(self.columns, self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Row):
+            return self.keys() == other.keys() and tuple.__eq__(self, other)
+        if isinstance(other, tuple):
+            return False
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return NotImplemented
+        return not equal
+
+    def __hash__(self) -> int:
+        return hash((self.keys(), tuple(self)))
+
+    def __repr__(self) -> str:
+        return f'Row({", ".join(f"{column}={value!r}" for column, value in self.items())})'
+
+    def __reduce__(self) -> tuple[Callable[[tuple[str, ...], tuple[Any, ...]], 'Row'], tuple[Any, ...]]:
+        return _make_row, (self.columns, tuple(self))
+
+
+@lru_cache(maxsize=256)
+def row_type(columns: tuple[str, ...]) -> type[Row]:
+    """
+    Return the subclass of :class:`Row` for the supplied ``columns``.
+    """
+
+    class ColumnsRow(Row):
+        __slots__ = ()
+
+    ColumnsRow.columns = columns
+    ColumnsRow.positions = {column: i for i, column in enumerate(columns)}
+    return ColumnsRow
+
+
+def _make_row(columns: tuple[str, ...], values: tuple[Any, ...]) -> Row:
+    return row_type(columns)(values)
+
+
+class Schema:
+    """
+    The compiled, immutable description of a table's columns, along with the
+    :class:`ValueParse` to use for each of them.
+
+    These are built by :meth:`TabularFormat.schema` and may be passed to the parse
+    methods of a format so that type names don't need to be resolved for every table.
+    As they cannot be modified, they may be shared between threads.
+    """
+
+    __slots__ = ('columns', 'parsers')
+
+    columns: tuple[str, ...]
+    parsers: tuple[ValueParse, ...]
+
+    def __init__(self, columns: Iterable[str], parsers: Iterable[ValueParse]) -> None:
+        columns = tuple(columns)
+        parsers = tuple(parsers)
+        if len(columns) != len(parsers):
+            raise ValueError(f'{len(columns)} columns but {len(parsers)} parsers')
+        object.__setattr__(self, 'columns', columns)
+        object.__setattr__(self, 'parsers', parsers)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self) -> tuple[type['Schema'], tuple[tuple[str, ...], tuple[ValueParse, ...]]]:
+        return type(self), (self.columns, self.parsers)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Schema):
+            return NotImplemented
+        return self.columns == other.columns and self.parsers == other.parsers
+
+    def __hash__(self) -> int:
+        return hash((self.columns, self.parsers))
+
+    def __repr__(self) -> str:
+        return f'<Schema: {", ".join(self.columns)}>'
+
+
+class ParseCache:
+    """
+    A bounded cache of parsed tables that may be shared between :class:`TabularFormat`
+    instances, evicting the least recently used table when ``maxsize`` would be exceeded.
+
+    Tables are cached by the type and parsing configuration of the format along with
+    the text parsed. The rows returned from a cache are copies, as are any values within
+    them that can be modified, so they may be changed without affecting the cache.
+    Tables parsed using parsing functions that cannot be hashed are not cached.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        #: The number of parses that were found in the cache.
+        self.hits = 0
+        #: The number of parses that were not found in the cache.
+        self.misses = 0
+        #: The number of parsed tables that have been evicted.
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the parsed table cached for ``key``, or ``None`` if there isn't one.
+        """
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return parsed
+
+    def put(self, key: Hashable, parsed: Any) -> None:
+        """
+        Cache the ``parsed`` table for ``key``.
+        """
+        with self._lock:
+            entries = self._entries
+            entries[key] = parsed
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove all parsed tables from this cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@cache
+def _source_digest(path: str, mtime: int, size: int) -> str:
+    return sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _module_digest(name: str) -> str:
+    path = getattr(sys.modules.get(name), '__file__', None)
+    if path is None:
+        if name in sys.builtin_module_names:
+            # part of the interpreter, so covered by the Python version:
+            return ''
+        raise TypeError(f'No source file for module {name!r}')
+    stat = os.stat(path)
+    return _source_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _describe(obj: Any) -> str:
+    # A description of obj that is the same in every process, or a TypeError if there isn't one:
+    if obj is None or type(obj) in (str, bytes, int, float, bool):
+        return repr(obj)
+    if type(obj) is tuple:
+        return f'({",".join(map(_describe, obj))})'
+    if isinstance(obj, Schema):
+        return f'Schema({_describe(obj.columns)},{_describe(obj.parsers)})'
+    if isinstance(obj, Enum):
+        return f'{_describe(type(obj))}.{obj.name}'
+    # functions and classes that can be found by name, along with the source of their module:
+    module = getattr(obj, '__module__', None)
+    if module is None:
+        # methods of builtin types, such as date.fromisoformat or str.strip:
+        owner = getattr(obj, '__objclass__', getattr(obj, '__self__', None))
+        if isinstance(owner, type):
+            module = owner.__module__
+    qualname = getattr(obj, '__qualname__', None)
+    if isinstance(module, str) and isinstance(qualname, str):
+        found: Any = sys.modules.get(module)
+        for name in qualname.split('.'):
+            found = getattr(found, name, None)
+        if found is obj or (found is not None and found == obj):
+            return f'{module}.{qualname}:{_module_digest(module)}'
+    raise TypeError(f'{obj!r} cannot be found by name so cannot be described')
+
+
+class DiskCache:
+    """
+    A cache of parsed tables that are stored as files in the supplied ``directory`` so
+    that they can be shared between processes and test runs.
+
+    Tables are cached by a digest of the text parsed, the type and parsing configuration
+    of the format and the versions of Python and chide being used, so changing any of these
+    means the table will be parsed again.
+
+    Parsing functions and classes are identified by their module and qualified name, along
+    with a digest of the source file of that module, so changing that file also means tables
+    will be parsed again. Tables parsed with callables that can't be found by name, such as
+    lambdas, nested functions and bound methods, are not cached, nor are tables containing
+    values that cannot be pickled. Changes to anything else a parser depends on, such as
+    other modules it uses, are not noticed, so :meth:`clear` should be used in that case.
+
+    Files are written atomically, so several processes may use the same directory.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        #: The number of parses that were found in the cache.
+        self.hits = 0
+        #: The number of parses that were not found in the cache.
+        self.misses = 0
+        try:
+            chide_version = version('chide')
+        except PackageNotFoundError:  # pragma: no cover
+            chide_version = None
+        self.versions = f'{sys.version}:{chide_version}'
+
+    def path(self, key: Hashable) -> Path:
+        """
+        Return the path of the file in which the table for ``key`` is stored.
+        A :class:`TypeError` is raised if ``key`` contains callables that cannot be
+        found by name.
+        """
+        digest = sha256(f'{self.versions}:{_describe(key)}'.encode()).hexdigest()
+        return self.directory / f'{digest}.pickle'
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the parsed table cached for ``key``, or ``None`` if there isn't one.
+        """
+        try:
+            with self.path(key).open('rb') as file:
+                parsed = pickle.load(file)
+        except (TypeError, OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            parsed = None
+        if parsed is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return parsed
+
+    def put(self, key: Hashable, parsed: Any) -> None:
+        """
+        Cache the ``parsed`` table for ``key``.
+        """
+        try:
+            data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        try:
+            path = self.path(key)
+        except TypeError:
+            return
+        with NamedTemporaryFile(dir=self.directory, prefix=path.stem, suffix='.tmp', delete=False) as file:
+            file.write(data)
+        os.replace(file.name, path)
+
+    def clear(self) -> None:
+        """
+        Remove all parsed tables from this cache.
+        """
+        for path in self.directory.glob('*.pickle'):
+            path.unlink(missing_ok=True)
+
+
+class TableCache(Protocol):
+    """
+    Protocol for caches of parsed tables, such as :class:`ParseCache` and :class:`DiskCache`.
+    """
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the parsed table cached for ``key``, or ``None`` if there isn't one.
+        """
+
+    def put(self, key: Hashable, parsed: Any) -> None:
+        """
+        Cache the ``parsed`` table for ``key``.
+        """
+
+
+def _copy_value(value: Any, memo: dict[int, Any]) -> Any:
+    if type(value) in CACHEABLE:
+        return value
+    return deepcopy(value, memo)
+
+
+def _copy_parsed(parsed: P) -> P:
+    copied = copy(parsed)
+    # shared so that values appearing in several cells are still shared in the copy:
+    memo: dict[int, Any] = {}
+    for i, row in enumerate(copied):
+        if type(row) is dict:
+            copied[i] = {column: _copy_value(value, memo) for column, value in row.items()}
+        elif isinstance(row, Row):
+            if not all(type(value) in CACHEABLE for value in row):
+                copied[i] = type(row)(_copy_value(value, memo) for value in row)
+    if isinstance(copied, (PrettyParsed, PrettyRows)):
+        copied.widths = dict(copied.widths)
+    return copied
+
+
+@cache
+def _numpy() -> Any:
+    try:
+        return import_module('numpy')
+    except ImportError:
+        return None
+
+
+#: The :mod:`array` type codes used for columns of each type.
+ARRAY_TYPECODES = {int: 'q', float: 'd'}
+
+
+def _typed_column(values: list[Any], numpy: bool) -> Any:
+    types = set(map(type, values))
+    if len(types) == 1 and (typecode := ARRAY_TYPECODES.get(types.pop())):
+        try:
+            if numpy and (numpy_ := _numpy()) is not None:
+                return numpy_.array(values, dtype=typecode)
+            return array(typecode, values)
+        except OverflowError:
+            pass
+    return values
+
+
+def _column_values(column: Iterable[Any]) -> Iterable[Any]:
+    # NumPy arrays would otherwise give NumPy scalars rather than Python values:
+    tolist = getattr(column, 'tolist', None)
+    if tolist is not None:
+        return tolist()  # type: ignore[no-any-return]
+    return column
+
 
 class TabularFormat(Format):
     """
@@ -98,6 +673,8 @@ class TabularFormat(Format):
         type_names: TypeNameMapping | None = None,
         column_render: ColumnRenderMapping | None = None,
         types_location: TypeLocation | None = None,
+        infer_types: int = 0,
+        cache: TableCache | None = None,
     ) -> None:
         self.type_parse: ParseMapping = type_parse or {}
         self.column_parse: ParseMapping = column_parse or {}
@@ -107,51 +684,281 @@ class TabularFormat(Format):
         self.column_render: ColumnRenderMapping = column_render or {}
         self.default_type_render = default_type_render
         self.types_location = types_location
+        self.infer_types = infer_types
+        self.cache = cache
+
+    def _fingerprint(self) -> tuple[Hashable, ...]:
+        return (
+            type(self),
+            tuple(self.type_parse.items()),
+            self.default_type_parse,
+            tuple(self.column_parse.items()),
+            self.types_location,
+            self.infer_types,
+        )
 
-    def _resolve_type_names(self, type_names: dict[str, str]) -> None:
-        for column, name in type_names.items():
-            if name:
-                if name not in self.column_parse:
-                    handler = self.type_parse.get(name)
-                    if handler is None:
-                        handler = getattr(builtins, name)
-                    self.column_parse[column] = handler
-
-    def _parse(self, text: str, lexer: Callable[[str], Iterable[Iterable[str]]]) -> list[Attrs]:
-        parsed = []
-        columns: list[str] | None = None
-        types_row_handled = self.types_location is not ROW
-        types_row_next = False
-        for parts in lexer(text):
-            if columns is not None and not types_row_handled:
-                types_row_next = True
-
-            if columns is None:
-                columns = []
-                type_names = {}
-                for c in parts:
-                    if self.types_location is HEADER and (match := self.header_type_pattern.match(c)):
-                        column, t = match.groups()
-                        type_names[column] = t
-                    else:
-                        column = c
-                    columns.append(column)
-                self._resolve_type_names(type_names)
-            elif types_row_next:
-                self._resolve_type_names(type_names={c: t for c, t in zip(columns, parts)})
-                types_row_handled = True
-                types_row_next = False
+    def _cached(self, text: str, schema: Schema | None, compact: bool, parse: Callable[[], P]) -> P:
+        cache = self.cache
+        if cache is None:
+            return parse()
+        key = (self._fingerprint(), text, schema, compact)
+        try:
+            hash(key)
+        except TypeError:
+            # such as when a parser cannot be hashed, so the table cannot be cached:
+            return parse()
+        parsed: P | None = cache.get(key)
+        if parsed is None:
+            parsed = parse()
+            cache.put(key, parsed)
+        return _copy_parsed(parsed)
+
+    def _parser(self, column: str, type_name: str | None) -> ValueParse:
+        handler = self.column_parse.get(column)
+        if handler is None and type_name:
+            handler = self.type_parse.get(type_name)
+            if handler is None:
+                handler = getattr(builtins, type_name)
+        if handler is None:
+            handler = self.default_type_parse
+        return handler
+
+    def _read_schema(self, rows: Iterator[Iterable[str]], schema: Schema | None) -> Schema | None:
+        parts = next(rows, None)
+        if parts is None:
+            return None
+        columns = []
+        type_names = {}
+        for c in parts:
+            if self.types_location is HEADER and (match := self.header_type_pattern.match(c)):
+                column, t = match.groups()
+                type_names[column] = t
             else:
-                row = {}
-                for column, value in zip(columns, parts):
-                    try:
-                        handler = self.column_parse.get(column, self.default_type_parse)
-                        value = handler(value)
-                    except ValueError:
-                        pass
-                    row[column] = value
-                parsed.append(row)
-        return parsed
+                column = c
+            columns.append(column)
+        if self.types_location is ROW:
+            parts = next(rows, None)
+            if parts is not None:
+                type_names = dict(zip(columns, parts))
+        if schema is None:
+            return Schema(columns, (self._parser(column, type_names.get(column)) for column in columns))
+        if tuple(columns) != schema.columns:
+            raise ValueError(f'Columns {columns!r} do not match schema columns {list(schema.columns)!r}')
+        return schema
+
+    @abstractmethod
+    def _lexer(self) -> Lexer: ...
+
+    @staticmethod
+    def _lines(source: Source) -> Iterable[str]:
+        if isinstance(source, str):
+            return StringIO(source)
+        if isinstance(source, os.PathLike):
+            return mapped_lines(source)
+        return source
+
+    def schema(self, source: Source) -> Schema:
+        """
+        Build a :class:`Schema` from the column names and, if present, the types found
+        at the start of the supplied ``source``, which may be text, a file-like object or a path.
+        Only the lines needed to do so are read.
+        """
+        schema = self._read_schema(iter(self._lexer()(self._lines(source))), None)
+        if schema is None:
+            raise ValueError('No columns found')
+        return schema
+
+    @overload
+    def iter_parse(
+        self, source: Source, schema: Schema | None = None, *, compact: Literal[False] = False
+    ) -> Iterator[Attrs]: ...
+
+    @overload
+    def iter_parse(
+        self, source: Source, schema: Schema | None = None, *, compact: Literal[True]
+    ) -> Iterator[Row]: ...
+
+    def iter_parse(
+        self, source: Source, schema: Schema | None = None, *, compact: bool = False
+    ) -> Iterator[Attrs] | Iterator[Row]:
+        """
+        Parse the supplied ``source``, which may be text, a file-like object or a path, yielding
+        one :class:`~chide.typing.Attrs` for each row as it is parsed.
+        Only one row is held in memory at a time.
+
+        If a ``schema`` is supplied, it will be used in place of any types found in the
+        ``source``, whose columns must match those of the ``schema``.
+
+        If ``compact`` is true, a :class:`Row` is yielded for each row instead.
+        """
+        lines = self._lines(source)
+        if compact:
+            return self._iter_parse(lines, self._lexer(), schema, self._compact_row)
+        return self._iter_parse(lines, self._lexer(), schema, self._row)
+
+    def _inferred(
+        self, parsers: tuple[ValueParse, ...], rows: Iterator[Iterable[str]]
+    ) -> tuple[tuple[ValueParse, ...], Iterator[Iterable[str]]]:
+        if self.infer_types:
+            samples = [list(parts) for parts in islice(rows, self.infer_types)]
+            parsers = self._infer(parsers, samples)
+            rows = chain(samples, rows)
+        return parsers, rows
+
+    def _iter_parse(
+        self,
+        lines: Iterable[str],
+        lexer: Lexer,
+        schema: Schema | None,
+        make: Callable[[tuple[str, ...], tuple[ValueParse, ...], Iterable[str]], R],
+    ) -> Iterator[R]:
+        rows = iter(lexer(lines))
+        schema = self._read_schema(rows, schema)
+        if schema is None:
+            return
+        columns = schema.columns
+        parsers, rows = self._inferred(schema.parsers, rows)
+        for parts in rows:
+            yield make(columns, parsers, parts)
+
+    def parse_columns(
+        self, source: Source, schema: Schema | None = None, numpy: bool = True
+    ) -> dict[str, Any]:
+        """
+        Parse the supplied ``source``, which may be text, a file-like object or a path, into a
+        mapping of column name to the values in that column, in row order.
+        Cells missing from the end of a row are ``None``.
+
+        Columns where all the values are :class:`int` or all the values are :class:`float`
+        are returned as NumPy arrays, if NumPy is installed and ``numpy`` is true, or typed
+        :class:`array.array` objects otherwise. Other columns are returned as lists.
+
+        If a ``schema`` is supplied, it will be used in place of any types found in the
+        ``source``, whose columns must match those of the ``schema``.
+        """
+        rows = iter(self._lexer()(self._lines(source)))
+        schema = self._read_schema(rows, schema)
+        if schema is None:
+            return {}
+        parsers, rows = self._inferred(schema.parsers, rows)
+        columns: list[list[Any]] = [[] for _ in schema.columns]
+        for parts in rows:
+            count = 0
+            for count, (parse, values, value) in enumerate(zip(parsers, columns, parts), start=1):
+                try:
+                    value = parse(value)
+                except ValueError:
+                    pass
+                values.append(value)
+            for values in columns[count:]:
+                values.append(None)
+        return {column: _typed_column(values, numpy) for column, values in zip(schema.columns, columns)}
+
+    def _chunk_lexer(self, lexer: Lexer) -> 'PrettyLexer | None':
+        # The lexer to use for chunks of lines, if they can be lexed independently,
+        # or None if rows should be lexed before being split into chunks.
+        return None
+
+    def _parse_parallel(
+        self, source: Source, schema: Schema | None, workers: int | None, chunk_size: int, compact: bool
+    ) -> tuple[list[Any], list[int]]:
+        lines = iter(self._lines(source))
+        lexer = self._lexer()
+        rows = iter(lexer(lines))
+        schema = self._read_schema(rows, schema)
+        if schema is None:
+            return [], []
+        columns = schema.columns
+        make = self._compact_row if compact else self._row
+        parsers = schema.parsers
+        parsed: list[Any] = []
+        if self.infer_types:
+            samples = [list(parts) for parts in islice(rows, self.infer_types)]
+            parsers = self._infer(parsers, samples)
+            parsed.extend(make(columns, parsers, sample) for sample in samples)
+
+        chunk_lexer = self._chunk_lexer(lexer)
+        items: Iterator[Any] = rows if chunk_lexer is None else lines
+        chunks = iter(lambda: list(islice(items, chunk_size)), [])
+        first = next(chunks, None)
+        second = next(chunks, None)
+        if first is None or second is None:
+            # Not worth starting processes for a single chunk:
+            results: Iterable[tuple[list[Any], list[int]]] = (
+                [] if first is None else [_parse_chunk(chunk_lexer, first, columns, parsers, compact)]
+            )
+            self._merge_chunks(parsed, chunk_lexer, results)
+        else:
+            # only read as many chunks as can be kept busy, rather than the whole source:
+            in_flight = 2 * (workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(workers) as executor:
+                results = _submit_chunks(
+                    executor,
+                    in_flight,
+                    chain((first, second), chunks),
+                    chunk_lexer,
+                    columns,
+                    parsers,
+                    compact,
+                )
+                self._merge_chunks(parsed, chunk_lexer, results)
+        return parsed, [] if chunk_lexer is None else chunk_lexer.widths
+
+    @staticmethod
+    def _merge_chunks(
+        parsed: list[Any], lexer: 'PrettyLexer | None', results: Iterable[tuple[list[Any], list[int]]]
+    ) -> None:
+        for rows, widths in results:
+            parsed.extend(rows)
+            if lexer is not None:
+                lexer._merge(widths)
+
+    @abstractmethod
+    def render(self, attrs: Iterable[Attrs | Row], ref: Sequence[Attrs | Row] | None = None) -> str: ...
+
+    def render_columns(
+        self, columns: Mapping[str, Iterable[Any]], ref: Sequence[Attrs | Row] | None = None
+    ) -> str:
+        """
+        Render the supplied mapping of column name to the values in that column, such as
+        is returned by :meth:`parse_columns`, into a :class:`str`. The columns may be lists,
+        :class:`array.array` objects or NumPy arrays. If supplied, ``ref`` is used in the
+        same way as for :meth:`render`.
+        """
+        names = list(columns)
+        values = (_column_values(column) for column in columns.values())
+        return self.render((dict(zip(names, row)) for row in zip(*values)), ref)
+
+    @staticmethod
+    def _infer(parsers: tuple[ValueParse, ...], samples: list[list[str]]) -> tuple[ValueParse, ...]:
+        return tuple(
+            infer_parse(sample[i] for sample in samples if i < len(sample))
+            if parser is default_parse
+            else parser
+            for i, parser in enumerate(parsers)
+        )
+
+    @staticmethod
+    def _row(columns: tuple[str, ...], parsers: tuple[ValueParse, ...], parts: Iterable[str]) -> Attrs:
+        row = {}
+        for column, parse, value in zip(columns, parsers, parts):
+            try:
+                value = parse(value)
+            except ValueError:
+                pass
+            row[column] = value
+        return row
+
+    @staticmethod
+    def _compact_row(columns: tuple[str, ...], parsers: tuple[ValueParse, ...], parts: Iterable[str]) -> Row:
+        values = []
+        for parse, value in zip(parsers, parts):
+            try:
+                value = parse(value)
+            except ValueError:
+                pass
+            values.append(value)
+        return row_type(columns)(values)
 
 
 class Widths(dict[str, int]):
@@ -161,54 +968,107 @@ class Widths(dict[str, int]):
             self[column] = max(width, self.get(column, 0))
 
 
-class RenderedRows(list[dict[str, str]]):
+class TypeRenderers(dict[type[Any], ValueRender]):
+    def __init__(self, format_: 'TabularFormat') -> None:
+        super().__init__()
+        self.type_render = format_.type_render
+        self.default_type_render = format_.default_type_render
+
+    def __missing__(self, type_: type[Any]) -> ValueRender:
+        handler = self[type_] = self.type_render.get(type_, self.default_type_render)
+        return handler
+
+
+class RowRenderer:
     columns: list[str] | None = None
     types: dict[str, str] | None = None
-    header: dict[str, str]
 
     def __init__(
-        self, attrs: Iterable[Attrs], format_: 'TabularFormat', columns: list[str] | None = None
+        self, format_: 'TabularFormat', columns: list[str] | None = None, widths: Widths | None = None
     ) -> None:
-        super().__init__()
-        for attrs_ in attrs:
-            if self.columns is None:
-                attr_columns = list(attrs_.keys())
-                if columns is None:
-                    self.columns = attr_columns
-                else:
-                    self.columns = columns + [c for c in attr_columns if c not in columns]
-            if self.types is None:
-                self.types = {}
-                for column, value in attrs_.items():
-                    type_ = type(value)
-                    type_name = format_.type_names.get(type_, type(value).__name__)
-                    self.types[column] = type_name or ''
-            row = {}
-            for column in self.columns:
-                value = attrs_.get(column)
-                handler = format_.column_render.get(column)
-                if handler is None:
-                    handler = format_.type_render.get(type(value), format_.default_type_render)
+        self.format_ = format_
+        self.ref_columns = columns
+        #: If not ``None``, updated with the widths of cells as they are rendered.
+        self.widths = widths
+        self.plan: list[tuple[str, ValueRender | None]] = []
+        self.type_renderers = TypeRenderers(format_)
+
+    def _compile(self, attrs_: Attrs | Row) -> list[str]:
+        format_ = self.format_
+        attr_columns = list(attrs_.keys())
+        if self.ref_columns is None:
+            columns = attr_columns
+        else:
+            columns = self.ref_columns + [c for c in attr_columns if c not in self.ref_columns]
+        types = {}
+        for column, value in attrs_.items():
+            type_ = type(value)
+            type_name = format_.type_names.get(type_, type(value).__name__)
+            types[column] = type_name or ''
+        self.types = {column: types[column] for column in columns if column in types}
+        self.plan = [(column, format_.column_render.get(column)) for column in columns]
+        if self.widths is not None:
+            for column in columns:
+                self.widths.setdefault(column, 0)
+        self.columns = columns
+        return columns
+
+    def __call__(self, attrs_: Attrs | Row) -> dict[str, str]:
+        if self.columns is None:
+            self._compile(attrs_)
+        type_renderers = self.type_renderers
+        widths = self.widths
+        row = {}
+        for column, handler in self.plan:
+            value = attrs_.get(column)
+            if handler is None:
+                text = type_renderers[type(value)](value)
+            else:
                 text = handler(value)
-                row[column] = text
-            self.append(row)
-
-        self.header = {}
+            row[column] = text
+            if widths is not None and len(text) > widths[column]:
+                widths[column] = len(text)
+        return row
+
+    @property
+    def header(self) -> dict[str, str]:
+        header = {}
         if self.columns is not None:
             for column in self.columns:
                 text = column
                 if self.types is not None and (type_name := self.types.get(column)) is not None:
-                    if format_.types_location is HEADER and type_name:
+                    if self.format_.types_location is HEADER and type_name:
                         text = f'{text} ({type_name})'
-                self.header[column] = text
+                header[column] = text
+        return header
 
-    def update(self, widths: Widths, types_location: TypeLocation | None) -> None:
-        if self.header:
-            widths.handle(self.header)
-        if self.types is not None and types_location is ROW:
+    def update(self, widths: Widths) -> None:
+        if header := self.header:
+            widths.handle(header)
+        if self.types is not None and self.format_.types_location is ROW:
             widths.handle(self.types)
-        for row in self:
-            widths.handle(row)
+
+
+class RenderedRows(list[dict[str, str]]):
+    columns: list[str] | None
+    types: dict[str, str] | None
+    header: dict[str, str]
+
+    def __init__(
+        self,
+        attrs: Iterable[Attrs | Row],
+        format_: 'TabularFormat',
+        columns: list[str] | None = None,
+        widths: Widths | None = None,
+    ) -> None:
+        renderer = RowRenderer(format_, columns, widths)
+        super().__init__(map(renderer, attrs))
+        if widths is not None:
+            renderer.update(widths)
+        self.renderer = renderer
+        self.columns = renderer.columns
+        self.types = renderer.types
+        self.header = renderer.header
 
 
 class PrettyLexer:
@@ -216,29 +1076,118 @@ class PrettyLexer:
         self.widths: list[int] = []
         self.padding = padding
 
-    def __call__(self, text: str) -> Iterable[list[str]]:
+    def _merge(self, widths: list[int]) -> None:
+        if self.widths:
+            self.widths = [max(w, w_) for w, w_ in zip_longest(self.widths, widths)]
+        else:
+            self.widths = widths
+
+    def _split(self, line: str) -> list[str]:
         padding_text = ' ' * self.padding
         padding_size = self.padding * 2
-        for line in dedent(text).splitlines():
+        parts = line.split('|')[1:-1]
+        widths = []
+        for part in parts:
+            width = len(part)
+            if (
+                width >= padding_size
+                and part[: self.padding] == padding_text
+                and part[-self.padding :] == padding_text
+            ):
+                width -= padding_size
+            widths.append(width)
+        self._merge(widths)
+        return [p.strip() for p in parts]
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[list[str]]:
+        for line in lines:
             line = line.strip()
             if not line or line.startswith('+'):
                 continue
-            parts = line.split('|')[1:-1]
-            widths = []
-            for part in parts:
-                width = len(part)
-                if (
-                    width >= padding_size
-                    and part[: self.padding] == padding_text
-                    and part[-self.padding :] == padding_text
-                ):
-                    width -= padding_size
-                widths.append(width)
-            if self.widths:
-                self.widths = [max(w, w_) for w, w_ in zip_longest(self.widths, widths)]
+            yield self._split(line)
+
+
+class FixedWidthLexer(PrettyLexer):
+    """
+    Slices rows at the column boundaries found in the most recent divider line,
+    so cells may contain ``|``. Rows that don't line up with the divider are split
+    on ``|`` instead.
+    """
+
+    def __init__(self, padding: int):
+        super().__init__(padding)
+        #: The most recent divider line seen, which is used for rows that follow it.
+        self.divider: str | None = None
+
+    @staticmethod
+    def _boundaries(divider: str | None) -> list[int]:
+        if divider is None:
+            return []
+        return [i for i, c in enumerate(divider) if c == '+']
+
+    def __call__(self, lines: Iterable[str]) -> Iterator[list[str]]:
+        padding_size = self.padding * 2
+        divider = self.divider
+        boundaries = self._boundaries(divider)
+        slices = [slice(start + 1, end) for start, end in pairwise(boundaries)]
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('+'):
+                if line != divider:
+                    self.divider = divider = line
+                    boundaries = self._boundaries(divider)
+                    slices = [slice(start + 1, end) for start, end in pairwise(boundaries)]
+                    sizes = [end - start - 1 for start, end in pairwise(boundaries)]
+                    self._merge([size - padding_size if size >= padding_size else size for size in sizes])
+                continue
+            if divider is not None and len(line) == len(divider) and all(line[i] == '|' for i in boundaries):
+                yield [line[s].strip() for s in slices]
             else:
-                self.widths = widths
-            yield [p.strip() for p in parts]
+                yield self._split(line)
+
+
+def _parse_chunk(
+    lexer: PrettyLexer | None,
+    items: list[Any],
+    columns: tuple[str, ...],
+    parsers: tuple[ValueParse, ...],
+    compact: bool,
+) -> tuple[list[Any], list[int]]:
+    # Parse a chunk of rows from a table, lexing them first if a lexer is supplied.
+    # This is a module-level function so that it can be used in a ProcessPoolExecutor.
+    make = TabularFormat._compact_row if compact else TabularFormat._row
+    parts = items if lexer is None else lexer(items)
+    rows = [make(columns, parsers, parts_) for parts_ in parts]
+    return rows, [] if lexer is None else lexer.widths
+
+
+def _submit_chunks(
+    executor: Executor,
+    in_flight: int,
+    chunks: Iterable[list[Any]],
+    lexer: PrettyLexer | None,
+    columns: tuple[str, ...],
+    parsers: tuple[ValueParse, ...],
+    compact: bool,
+) -> Iterator[tuple[list[Any], list[int]]]:
+    # Parse chunks using the executor, in order, with at most in_flight chunks submitted at once.
+    pending: deque[Future[tuple[list[Any], list[int]]]] = deque()
+    for chunk in chunks:
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+        pending.append(executor.submit(_parse_chunk, lexer, chunk, columns, parsers, compact))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _column_widths(rows: Sequence[Attrs | Row], widths: list[int]) -> dict[str, int]:
+    column_widths = {}
+    if rows:
+        for column, width in zip(rows[0].keys(), widths):
+            column_widths[column] = width
+    return column_widths
 
 
 class PrettyParsed(list[Attrs]):
@@ -250,29 +1199,49 @@ class PrettyParsed(list[Attrs]):
     def __init__(self, attrs: list[Attrs], widths: list[int]) -> None:
         super().__init__(attrs)
         #: The widths required for the columns needed by these `~chide.typing.Attrs`.
-        self.widths: dict[str, int] = {}
-        if attrs:
-            for columns, width in zip(attrs[0].keys(), widths):
-                self.widths[columns] = width
+        self.widths: dict[str, int] = _column_widths(attrs, widths)
 
 
-class PrettyRenderedRows(list[str]):
-    def __init__(self, widths: Widths, padding: int) -> None:
-        super().__init__()
-        self.divider = ''.join('+' + '-' * (widths[column] + padding * 2) for column in widths) + '+\n'
+class PrettyRows(list[Row]):
+    """
+    A list of compact :class:`Row` objects that also keeps track of the :attr:`widths`
+    required to render the columns, if they are known.
+    """
+
+    def __init__(self, rows: list[Row], widths: list[int]) -> None:
+        super().__init__(rows)
+        #: The widths required for the columns needed by these rows.
+        self.widths: dict[str, int] = _column_widths(rows, widths)
+
+
+class PrettyWriter:
+    def __init__(self, fp: TextIO, widths: Widths, padding: int, columns: list[str] | None = None) -> None:
+        self.write = fp.write
+        if columns is None:
+            columns = list(widths)
+        self.divider = ''.join('+' + '-' * (widths[column] + padding * 2) for column in columns) + '+\n'
         pad = padding * ' '
         self.templates = {c: f'|{pad}{{:{w}}}{pad}' for c, w in widths.items()}
         self.widths = widths
 
     def add_divider(self) -> None:
-        self.append(self.divider)
+        self.write(self.divider)
 
     def add_row(self, row: dict[str, str]) -> None:
         parts = (self.templates[column].format(value) for column, value in row.items())
-        self.append(''.join(parts) + '|\n')
+        self.write(''.join(parts) + '|\n')
 
-    def text(self) -> str:
-        return ''.join(self)
+    def add_line(self, text: str) -> None:
+        self.write(f'|{text.center(len(self.divider) - 3)}|\n')
+
+    def add_header(self, renderer: RowRenderer, types_location: TypeLocation | None) -> None:
+        self.add_divider()
+        if header := renderer.header:
+            self.add_row(header)
+            self.add_divider()
+        if renderer.types is not None and types_location is ROW:
+            self.add_row(renderer.types)
+            self.add_divider()
 
 
 class PrettyFormat(TabularFormat):
@@ -325,6 +1294,21 @@ class PrettyFormat(TabularFormat):
 
     :param padding:
         The number of space to put to the left and right of values of cells.
+
+    :param infer_types:
+        The number of rows to sample when inferring the type of columns that would
+        otherwise be parsed with :func:`default_parse`. A parser for the inferred type
+        is then used for the whole column, with cells that don't fit falling back to
+        :func:`default_parse`. The default of ``0`` turns off type inference.
+
+    :param fixed_width:
+        If true, rows are sliced into cells at the column boundaries found in divider
+        lines rather than being split on every ``|``, which is quicker for large tables
+        and allows cells to contain ``|``.
+
+    :param cache:
+        An optional :class:`TableCache`, such as a :class:`ParseCache` or :class:`DiskCache`,
+        in which tables parsed from text are cached.
     """
 
     def __init__(
@@ -339,6 +1323,9 @@ class PrettyFormat(TabularFormat):
         types_location: TypeLocation | None = None,
         minimum_column_widths: dict[str, int] | None = None,
         padding: int = 1,
+        infer_types: int = 0,
+        fixed_width: bool = False,
+        cache: TableCache | None = None,
     ) -> None:
         super().__init__(
             type_parse,
@@ -349,21 +1336,161 @@ class PrettyFormat(TabularFormat):
             type_names,
             column_render,
             types_location,
+            infer_types,
+            cache,
         )
         self.minimum_column_widths: dict[str, int] = minimum_column_widths or {}
         self.padding = padding
-
-    def parse(self, text: str) -> PrettyParsed:
+        self.fixed_width = fixed_width
+
+    def _fingerprint(self) -> tuple[Hashable, ...]:
+        return super()._fingerprint() + (self.padding, self.fixed_width)
+
+    def _lexer(self) -> PrettyLexer:
+        if self.fixed_width:
+            return FixedWidthLexer(self.padding)
+        return PrettyLexer(self.padding)
+
+    def _parse(self, lines: Iterable[str], schema: Schema | None, compact: bool) -> PrettyParsed | PrettyRows:
+        lexer = self._lexer()
+        if compact:
+            rows = list(self._iter_parse(lines, lexer, schema, self._compact_row))
+            return PrettyRows(rows, lexer.widths)
+        attrs = list(self._iter_parse(lines, lexer, schema, self._row))
+        return PrettyParsed(attrs, lexer.widths)
+
+    @overload
+    def parse(
+        self, text: str, schema: Schema | None = None, *, compact: Literal[False] = False
+    ) -> PrettyParsed: ...
+
+    @overload
+    def parse(self, text: str, schema: Schema | None = None, *, compact: Literal[True]) -> PrettyRows: ...
+
+    def parse(
+        self, text: str, schema: Schema | None = None, *, compact: bool = False
+    ) -> PrettyParsed | PrettyRows:
         """
         Parse the supplied ``text`` into a :class:`PrettyParsed`.
+        If supplied, ``schema`` is used in place of any types found in the ``text``.
+        If ``compact`` is true, a :class:`PrettyRows` of compact :class:`Row` objects
+        is returned instead.
         """
-        lexer = PrettyLexer(self.padding)
-        rows = self._parse(text, lexer)
-        return PrettyParsed(rows, lexer.widths)
+        return self._cached(text, schema, compact, lambda: self._parse(StringIO(text), schema, compact))
 
-    def render(self, attrs: Iterable[Attrs], ref: list[Attrs] | PrettyParsed | None = None) -> str:
+    @overload
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: Literal[False] = False
+    ) -> PrettyParsed: ...
+
+    @overload
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: Literal[True]
+    ) -> PrettyRows: ...
+
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: bool = False
+    ) -> PrettyParsed | PrettyRows:
         """
-        Render the supplied :class:`~chide.typing.Attrs` into a :class:`str`.
+        Parse the text read from the supplied file-like object into a :class:`PrettyParsed`.
+        The file is read one line at a time.
+        If supplied, ``schema`` is used in place of any types found in the file.
+        If ``compact`` is true, a :class:`PrettyRows` of compact :class:`Row` objects
+        is returned instead.
+        """
+        return self._parse(file, schema, compact)
+
+    @overload
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: Literal[False] = False,
+    ) -> PrettyParsed: ...
+
+    @overload
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: Literal[True],
+    ) -> PrettyRows: ...
+
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: bool = False,
+    ) -> PrettyParsed | PrettyRows:
+        """
+        Parse the file at the supplied ``path`` into a :class:`PrettyParsed`.
+        The file is memory mapped, with each line decoded using ``encoding`` as it is parsed.
+        The ``schema`` and ``compact`` parameters are used in the same way as for :meth:`parse`.
+        """
+        return self._parse(mapped_lines(path, encoding), schema, compact)
+
+    def _chunk_lexer(self, lexer: Lexer) -> PrettyLexer | None:
+        return lexer if isinstance(lexer, PrettyLexer) else None
+
+    @overload
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: Literal[False] = False,
+    ) -> PrettyParsed: ...
+
+    @overload
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: Literal[True],
+    ) -> PrettyRows: ...
+
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: bool = False,
+    ) -> PrettyParsed | PrettyRows:
+        """
+        Parse the supplied ``source``, which may be text, a file-like object or a path, using
+        a :class:`~concurrent.futures.ProcessPoolExecutor` with at most ``workers`` processes.
+
+        Once the header and any types row have been handled, the remaining rows are split
+        into chunks of ``chunk_size`` rows which are parsed in separate processes, with the
+        results combined in their original order. Only twice as many chunks as there are
+        processes are read ahead of the results being combined. The parsing functions used
+        must be able to be pickled. If there is only one chunk, it is parsed in the current
+        process.
+
+        The ``schema`` and ``compact`` parameters are used in the same way as for :meth:`parse`
+        and the widths of the columns in each chunk are combined.
+        """
+        rows, widths = self._parse_parallel(source, schema, workers, chunk_size, compact)
+        if compact:
+            return PrettyRows(rows, widths)
+        return PrettyParsed(rows, widths)
+
+    def render(self, attrs: Iterable[Attrs | Row], ref: Sequence[Attrs | Row] | None = None) -> str:
+        """
+        Render the supplied :class:`~chide.typing.Attrs` or :class:`Row` objects into a :class:`str`.
 
         If supplied, ``ref`` is used for reference to make sure:
 
@@ -371,35 +1498,142 @@ class PrettyFormat(TabularFormat):
         - columns are rendered in the order specified in the reference.
         - columns widths will be at least as wide as those in the reference.
         """
+        columns, widths = self._reference(ref)
+
+        rows = RenderedRows(attrs, self, columns, widths)
+
+        text = StringIO()
+        writer = PrettyWriter(text, widths, self.padding, rows.columns)
+        writer.add_header(rows.renderer, self.types_location)
+        for row in rows:
+            writer.add_row(row)
+        writer.add_divider()
+
+        return text.getvalue()
+
+    def _reference(self, ref: Sequence[Attrs | Row] | None) -> tuple[list[str] | None, Widths]:
         columns = None
         widths = Widths(self.minimum_column_widths)
-
         if ref is not None:
             ref_widths = getattr(ref, 'widths', None)
             if ref_widths is None:
-                ref_rows = RenderedRows(ref, self)
-                ref_rows.update(widths, self.types_location)
+                ref_rows = RenderedRows(ref, self, widths=widths)
                 columns = ref_rows.columns
             else:
                 widths.handle(ref_widths)
                 columns = list(ref_widths)
+        return columns, widths
 
-        rows = RenderedRows(attrs, self, columns)
-        rows.update(widths, self.types_location)
-
-        rendered = PrettyRenderedRows(widths, self.padding)
-        rendered.add_divider()
-        if rows.header:
-            rendered.add_row(rows.header)
-            rendered.add_divider()
-        if rows.types is not None and self.types_location is ROW:
-            rendered.add_row(rows.types)
-            rendered.add_divider()
-        for row in rows:
-            rendered.add_row(row)
-        rendered.add_divider()
+    def render_to(
+        self,
+        fp: TextIO,
+        attrs: Iterable[Attrs | Row],
+        ref: Sequence[Attrs | Row] | None = None,
+        single_pass: bool = False,
+    ) -> None:
+        """
+        Render the supplied :class:`~chide.typing.Attrs` or :class:`Row` objects to the
+        file-like object ``fp``, one line at a time, with ``ref`` used in the same way as
+        for :meth:`render`.
+
+        By default, ``attrs`` is iterated over twice, once to work out the widths of
+        columns and again to write the lines of the table, so it must be something
+        like a list rather than an iterator. A :class:`TypeError` is raised if it is
+        an iterator.
+
+        If ``single_pass`` is true, ``attrs`` is only iterated over once, with column
+        widths coming from ``ref``, the ``minimum_column_widths`` and the first row.
+        Cells wider than their column will not be aligned with the rest of the table.
+        """
+        if not single_pass and iter(attrs) is attrs:
+            raise TypeError('Iterators can only be rendered with single_pass=True')
+        columns, widths = self._reference(ref)
+        renderer = RowRenderer(self, columns, widths)
+        if single_pass:
+            writer = None
+            for attrs_ in attrs:
+                row = renderer(attrs_)
+                if writer is None:
+                    renderer.update(widths)
+                    renderer.widths = None
+                    writer = PrettyWriter(fp, widths, self.padding, renderer.columns)
+                    writer.add_header(renderer, self.types_location)
+                writer.add_row(row)
+            if writer is None:
+                writer = PrettyWriter(fp, widths, self.padding)
+                writer.add_divider()
+        else:
+            for attrs_ in attrs:
+                renderer(attrs_)
+            renderer.update(widths)
+            renderer.widths = None
+            writer = PrettyWriter(fp, widths, self.padding, renderer.columns)
+            writer.add_header(renderer, self.types_location)
+            for attrs_ in attrs:
+                writer.add_row(renderer(attrs_))
+        writer.add_divider()
+
+    def render_truncated(
+        self,
+        attrs: Iterable[Attrs | Row],
+        ref: Sequence[Attrs | Row] | None = None,
+        head: int = 10,
+        tail: int = 10,
+        max_size: int = 100_000,
+    ) -> str:
+        """
+        Render the first ``head`` and last ``tail`` of the supplied :class:`~chide.typing.Attrs`
+        or :class:`Row` objects into a :class:`str`, with a line giving the number of rows
+        omitted between them. ``ref`` is used in the same way as for :meth:`render`.
+
+        ``attrs`` is only iterated over once and only the rows to be rendered are kept,
+        with column widths coming from those rows along with ``ref`` and the
+        ``minimum_column_widths``. If the rendered text would be longer than ``max_size``
+        characters, it is cut short at the end of a line with a note saying so, such that
+        it is never longer than ``max_size``.
+        """
+        columns, widths = self._reference(ref)
+        renderer = RowRenderer(self, columns, widths)
+        head_rows = []
+        tail_attrs: deque[Attrs | Row] = deque(maxlen=tail)
+        count = 0
+        for attrs_ in attrs:
+            if count < head:
+                head_rows.append(renderer(attrs_))
+            else:
+                if renderer.columns is None:
+                    # compile the columns without this row's cells affecting their widths:
+                    renderer._compile(attrs_)
+                tail_attrs.append(attrs_)
+            count += 1
+        tail_rows = [renderer(attrs_) for attrs_ in tail_attrs]
+        renderer.update(widths)
+        omitted = count - len(head_rows) - len(tail_rows)
+        elision = f'... {omitted} row{"" if omitted == 1 else "s"} omitted ...'
+        if omitted and renderer.columns:
+            # widen the last column so that the elision line fits within the table:
+            inside = sum(widths[column] + self.padding * 2 + 1 for column in renderer.columns) - 1
+            if len(elision) > inside:
+                widths[renderer.columns[-1]] += len(elision) - inside
 
-        return rendered.text()
+        text = StringIO()
+        writer = PrettyWriter(text, widths, self.padding, renderer.columns)
+        writer.add_header(renderer, self.types_location)
+        for row in head_rows:
+            writer.add_row(row)
+        if omitted:
+            writer.add_line(elision)
+        for row in tail_rows:
+            writer.add_row(row)
+        writer.add_divider()
+
+        rendered = text.getvalue()
+        if len(rendered) > max_size:
+            note = f'... truncated to {max_size} characters ...\n'
+            end = rendered.rfind('\n', 0, max(max_size - len(note), 0)) + 1
+            # the note is cut short too if even it is longer than max_size:
+            rendered = (rendered[:end] + note)[: max(max_size, 0)]
+        return rendered
 
 
 class CSVFormat(TabularFormat):
@@ -437,33 +1671,404 @@ class CSVFormat(TabularFormat):
     :param types_location:
         An optional location from which type information will be parsed or to which it
         will be rendered. Must be :any:`HEADER`, :any:`ROW` or ``None``.
+
+    :param infer_types:
+        The number of rows to sample when inferring the type of columns that would
+        otherwise be parsed with :func:`default_parse`. A parser for the inferred type
+        is then used for the whole column, with cells that don't fit falling back to
+        :func:`default_parse`. The default of ``0`` turns off type inference.
+
+    :param cache:
+        An optional :class:`TableCache`, such as a :class:`ParseCache` or :class:`DiskCache`,
+        in which tables parsed from text are cached.
     """
 
-    def parse(self, text: str) -> list[Attrs]:
-        return self._parse(text, lambda text: [row for row in csv.reader(StringIO(text))])
+    def _lexer(self) -> Lexer:
+        return csv.reader
+
+    @overload
+    def parse(
+        self, text: str, schema: Schema | None = None, *, compact: Literal[False] = False
+    ) -> list[Attrs]: ...
 
-    def render(self, attrs: Iterable[Attrs], ref: list[Attrs] | None = None) -> str:
+    @overload
+    def parse(self, text: str, schema: Schema | None = None, *, compact: Literal[True]) -> list[Row]: ...
+
+    def parse(
+        self, text: str, schema: Schema | None = None, *, compact: bool = False
+    ) -> list[Attrs] | list[Row]:
         """
-        Render the supplied :class:`~chide.typing.Attrs` into a :class:`str`.
+        Parse the supplied ``text`` into a list of :class:`~chide.typing.Attrs`.
+        If supplied, ``schema`` is used in place of any types found in the ``text``.
+        If ``compact`` is true, a list of compact :class:`Row` objects is returned instead.
+        """
+        if compact:
+            return self._cached(
+                text, schema, compact, lambda: self.parse_file(StringIO(text), schema, compact=True)
+            )
+        return self._cached(text, schema, compact, lambda: self.parse_file(StringIO(text), schema))
+
+    @overload
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: Literal[False] = False
+    ) -> list[Attrs]: ...
+
+    @overload
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: Literal[True]
+    ) -> list[Row]: ...
+
+    def parse_file(
+        self, file: TextIO, schema: Schema | None = None, *, compact: bool = False
+    ) -> list[Attrs] | list[Row]:
+        """
+        Parse the text read from the supplied file-like object into a list of
+        :class:`~chide.typing.Attrs`. The file should be opened with ``newline=''``
+        and is read one line at a time.
+        If supplied, ``schema`` is used in place of any types found in the file.
+        If ``compact`` is true, a list of compact :class:`Row` objects is returned instead.
+        """
+        if compact:
+            return list(self.iter_parse(file, schema, compact=True))
+        return list(self.iter_parse(file, schema))
+
+    @overload
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: Literal[False] = False,
+    ) -> list[Attrs]: ...
+
+    @overload
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: Literal[True],
+    ) -> list[Row]: ...
+
+    def parse_path(
+        self,
+        path: str | os.PathLike[str],
+        schema: Schema | None = None,
+        *,
+        encoding: str = 'utf-8',
+        compact: bool = False,
+    ) -> list[Attrs] | list[Row]:
+        """
+        Parse the file at the supplied ``path`` into a list of :class:`~chide.typing.Attrs`.
+        The file is memory mapped, with each line decoded using ``encoding`` as it is parsed.
+        The ``schema`` and ``compact`` parameters are used in the same way as for :meth:`parse`.
+        """
+        lines = mapped_lines(path, encoding)
+        if compact:
+            return list(self._iter_parse(lines, self._lexer(), schema, self._compact_row))
+        return list(self._iter_parse(lines, self._lexer(), schema, self._row))
+
+    @overload
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: Literal[False] = False,
+    ) -> list[Attrs]: ...
+
+    @overload
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: Literal[True],
+    ) -> list[Row]: ...
+
+    def parse_parallel(
+        self,
+        source: Source,
+        schema: Schema | None = None,
+        *,
+        workers: int | None = None,
+        chunk_size: int = 10_000,
+        compact: bool = False,
+    ) -> list[Attrs] | list[Row]:
+        """
+        Parse the supplied ``source``, which may be text, a file-like object or a path, using
+        a :class:`~concurrent.futures.ProcessPoolExecutor` with at most ``workers`` processes.
+
+        Once the header and any types row have been handled, the remaining rows are split
+        into chunks of ``chunk_size`` rows which are parsed in separate processes, with the
+        results combined in their original order. Only twice as many chunks as there are
+        processes are read ahead of the results being combined. The parsing functions used
+        must be able to be pickled. If there is only one chunk, it is parsed in the current
+        process.
+        Rows are split into cells in the current process.
+
+        The ``schema`` and ``compact`` parameters are used in the same way as for :meth:`parse`.
+        """
+        rows, _ = self._parse_parallel(source, schema, workers, chunk_size, compact)
+        return rows
+
+    def render(self, attrs: Iterable[Attrs | Row], ref: Sequence[Attrs | Row] | None = None) -> str:
+        """
+        Render the supplied :class:`~chide.typing.Attrs` or :class:`Row` objects into a :class:`str`.
 
         If supplied, ``ref`` is used for reference to make sure:
 
         - the reference columns are always present.
         - columns are rendered in the order specified in the reference.
         """
+        text = StringIO()
+        self.writer(text, ref).write_rows(attrs)
+        return text.getvalue()
+
+    def writer(self, stream: TextIO, ref: Sequence[Attrs | Row] | None = None) -> 'CSVWriter':
+        """
+        Return a :class:`CSVWriter` that will write rows to the supplied ``stream``
+        as they are passed to it. If supplied, ``ref`` is used in the same way as
+        for :meth:`render`.
+        """
+        return CSVWriter(self, stream, ref)
+
+
+class CSVWriter:
+    """
+    Writes :class:`~chide.typing.Attrs` to a file-like object as comma separated values,
+    as they are passed to it, using the rendering rules of the supplied :class:`CSVFormat`.
+
+    The header, and types row if required, are written along with the first row.
+    The columns are taken from the ``ref``, if supplied, and the first row, so any other
+    columns in later rows are not written.
+    The ``stream`` should be opened with ``newline=''``.
+    """
+
+    def __init__(self, format_: CSVFormat, stream: TextIO, ref: Sequence[Attrs | Row] | None = None) -> None:
         columns = None
         if ref:
-            columns = list(ref[0])
+            columns = list(ref[0].keys())
+        self.renderer = RowRenderer(format_, columns)
+        self.types_location = format_.types_location
+        self.writer = csv.writer(stream)
+        self.started = False
 
-        rows = RenderedRows(attrs, self, columns)
-        text = StringIO()
-        writer = csv.writer(text)
+    def write_row(self, attrs: Attrs | Row) -> None:
+        """
+        Write the supplied :class:`~chide.typing.Attrs` as a row.
+        """
+        self.write_rows((attrs,))
 
-        if rows.header:
-            writer.writerow(rows.header.values())
-        if rows.types is not None and self.types_location is ROW:
-            writer.writerow(rows.types.values())
-        for row in rows:
-            writer.writerow(row.values())
+    def write_rows(self, attrs: Iterable[Attrs | Row]) -> None:
+        """
+        Write a row for each of the supplied :class:`~chide.typing.Attrs`, rendering
+        and writing them one at a time.
+        """
+        rows = map(self.renderer, attrs)
+        if not self.started:
+            first = next(rows, None)
+            if first is None:
+                return
+            if header := self.renderer.header:
+                self.writer.writerow(header.values())
+            if self.renderer.types is not None and self.types_location is ROW:
+                self.writer.writerow(self.renderer.types.values())
+            self.writer.writerow(first.values())
+            self.started = True
+        self.writer.writerows(row.values() for row in rows)
+
+
+def _freeze(value: Any) -> Hashable:
+    # A hashable equivalent of value, so rows containing lists and the like can be counted.
+    # The type is included so that, for example, a list is not the same as a tuple:
+    try:
+        hash(value)
+    except TypeError:
+        contents: Hashable
+        if isinstance(value, Mapping):
+            contents = frozenset((k, _freeze(v)) for k, v in value.items())
+        elif isinstance(value, set):
+            contents = frozenset(map(_freeze, value))
+        elif isinstance(value, Iterable):
+            contents = tuple(map(_freeze, value))
+        else:
+            raise TypeError(f'Cannot compare unhashable value {value!r}') from None
+        return type(value), contents
+    return value  # type: ignore[no-any-return]
+
+
+class RowDiff:
+    """
+    A row found in both tables being compared by :func:`compare_tables` that has
+    different values in each of them.
+    """
 
-        return text.getvalue()
+    def __init__(self, expected: Attrs, actual: Attrs, columns: Iterable[str]) -> None:
+        #: The row as found in the expected table.
+        self.expected = expected
+        #: The row as found in the actual table.
+        self.actual = actual
+        #: A mapping of column name to the expected and actual values of the cells that differ.
+        self.cells: dict[str, tuple[Any, Any]] = {}
+        for column in columns:
+            expected_value = expected[column]
+            actual_value = actual[column]
+            if expected_value != actual_value:
+                self.cells[column] = expected_value, actual_value
+
+    def __repr__(self) -> str:
+        return f'<RowDiff: {self.cells!r}>'
+
+
+_SAME = ' '
+_REMOVED = '-'
+_ADDED = '+'
+_CHANGED = _REMOVED + _ADDED
+
+
+class TableDiff:
+    """
+    The differences between two tables found by :func:`compare_tables`.
+    All rows have a value for every column found in either table, with missing cells
+    being ``None``. A :class:`TableDiff` is false if the tables are the same.
+    """
+
+    def __init__(self, columns: list[str], entries: list[tuple[str, Attrs | None, Attrs | None]]) -> None:
+        #: The names of all the columns found in either table.
+        self.columns = columns
+        self._entries = entries
+        #: The rows only found in the actual table.
+        self.added: list[Attrs] = []
+        #: The rows only found in the expected table.
+        self.removed: list[Attrs] = []
+        #: The rows found in both tables but with different values.
+        self.changed: list[RowDiff] = []
+        for status, expected, actual in entries:
+            if expected is None:
+                assert actual is not None
+                self.added.append(actual)
+            elif actual is None:
+                self.removed.append(expected)
+            elif status is not _SAME:
+                self.changed.append(RowDiff(expected, actual, columns))
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (
+            f'<TableDiff: {len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed>'
+        )
+
+    def render(self, format_: PrettyFormat | None = None, context: int = 0) -> str:
+        """
+        Render the rows that differ as a table, using the supplied ``format_`` or a default
+        :class:`PrettyFormat`. An extra first column marks rows only found in the expected
+        table with ``-`` and rows only found in the actual table with ``+``. Rows that have
+        changed are shown as both. If ``context`` is more than zero, up to that many rows
+        that are the same in both tables are shown before and after each difference.
+        An empty string is returned if there are no differences.
+        """
+        if not self:
+            return ''
+        entries = self._entries
+        show = [False] * len(entries)
+        for i, (status, _, _) in enumerate(entries):
+            if status is not _SAME:
+                for j in range(max(0, i - context), min(len(entries), i + context + 1)):
+                    show[j] = True
+        rows = []
+        for (status, expected, actual), shown in zip(entries, show):
+            if not shown:
+                continue
+            if status is _SAME:
+                assert expected is not None
+                rows.append({'': _SAME, **expected})
+                continue
+            if expected is not None:
+                rows.append({'': _REMOVED, **expected})
+            if actual is not None:
+                rows.append({'': _ADDED, **actual})
+        if format_ is None:
+            format_ = PrettyFormat()
+        return format_.render(rows)
+
+
+def compare_tables(
+    expected: Iterable[Attrs | Row], actual: Iterable[Attrs | Row], key: str | Sequence[str] | None = None
+) -> TableDiff:
+    """
+    Compare the ``expected`` and ``actual`` tables, returning a :class:`TableDiff` of the
+    rows that are only in one of them or, if ``key`` is supplied, that have changed.
+
+    If supplied, ``key`` is the name, or sequence of names, of the columns that identify a
+    row, and rows in the two tables with the same key are compared cell by cell.
+    A :class:`ValueError` is raised if more than one row in a table has the same key.
+    Otherwise, the tables are compared as unordered collections of rows.
+    Rows are matched using hashing, so comparing large tables takes linear time.
+    Values that cannot be hashed must be mappings, sets or other iterables,
+    otherwise a :class:`TypeError` is raised.
+    """
+    expected = list(expected)
+    actual = list(actual)
+    columns = list(
+        dict.fromkeys(column for table in (expected, actual) for row in table for column in row.keys())
+    )
+
+    def normalise(row: Attrs | Row) -> Attrs:
+        return {column: row.get(column) for column in columns}
+
+    entries: list[tuple[str, Attrs | None, Attrs | None]] = []
+    if key is not None:
+        key_columns = (key,) if isinstance(key, str) else tuple(key)
+
+        def index(table: list[Attrs | Row], name: str) -> dict[Hashable, Attrs]:
+            rows: dict[Hashable, Attrs] = {}
+            for row in table:
+                row_key = _freeze(tuple(row.get(column) for column in key_columns))
+                if row_key in rows:
+                    raise ValueError(f'Duplicate key {row_key!r} in {name} table')
+                rows[row_key] = normalise(row)
+            return rows
+
+        expected_rows = index(expected, 'expected')
+        actual_rows = index(actual, 'actual')
+        for row_key, expected_row in expected_rows.items():
+            actual_row = actual_rows.get(row_key)
+            if actual_row is None:
+                entries.append((_REMOVED, expected_row, None))
+            elif expected_row == actual_row:
+                entries.append((_SAME, expected_row, actual_row))
+            else:
+                entries.append((_CHANGED, expected_row, actual_row))
+        for row_key, actual_row in actual_rows.items():
+            if row_key not in expected_rows:
+                entries.append((_ADDED, None, actual_row))
+    else:
+
+        def freeze(row: Attrs) -> Hashable:
+            return _freeze(tuple(row.values()))
+
+        actual_rows_ = [normalise(row) for row in actual]
+        counts = Counter(map(freeze, actual_rows_))
+        for row in expected:
+            expected_row = normalise(row)
+            frozen = freeze(expected_row)
+            if counts[frozen]:
+                counts[frozen] -= 1
+                entries.append((_SAME, expected_row, expected_row))
+            else:
+                entries.append((_REMOVED, expected_row, None))
+        for actual_row in actual_rows_:
+            frozen = freeze(actual_row)
+            if counts[frozen]:
+                counts[frozen] -= 1
+                entries.append((_ADDED, None, actual_row))
+    return TableDiff(columns, entries)
@@ -0,0 +1,106 @@
+from copy import copy, deepcopy
+from typing import Any, Callable, Iterator, SupportsIndex, TypeVar, cast
+
+__all__ = ['LazyProxy', 'resolve']
+
+T = TypeVar('T')
+
+_UNRESOLVED = object()
+
+
+class LazyProxy:
+    """
+    A stand-in for a sample object that is only made the first time the proxy is used.
+    These are produced when a :func:`~chide.nest` marker with ``lazy=True`` is resolved.
+
+    Attribute access, item access, comparison, hashing and :func:`isinstance` checks are
+    all passed through to the sample object. Copying or pickling a proxy copies or pickles
+    the sample object. Code that checks the exact type of an object, such as SQLAlchemy's
+    instrumentation, will see the proxy. Use :func:`resolve` where the sample object itself
+    is needed.
+    """
+
+    __slots__ = ('_factory', '_obj')
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_obj', _UNRESOLVED)
+
+    def _resolve(self) -> Any:
+        obj = self._obj
+        if obj is _UNRESOLVED:
+            obj = self._factory()
+            object.__setattr__(self, '_obj', obj)
+            object.__setattr__(self, '_factory', None)
+        return obj
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type:
+        return type(self._resolve())
+
+    def __getattr__(self, name: str) -> Any:
+        if name in LazyProxy.__slots__:
+            # a proxy made without __init__, such as by copy or pickle:
+            raise AttributeError(name)
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._resolve(), name)
+
+    def __copy__(self) -> Any:
+        return copy(self._resolve())
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Any:
+        return deepcopy(self._resolve(), memo)
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Any:
+        return self._resolve().__reduce_ex__(protocol)
+
+    def __repr__(self) -> str:
+        return repr(self._resolve())
+
+    def __str__(self) -> str:
+        return str(self._resolve())
+
+    def __eq__(self, other: object) -> bool:
+        return bool(self._resolve() == resolve(other))
+
+    def __ne__(self, other: object) -> bool:
+        return bool(self._resolve() != resolve(other))
+
+    def __hash__(self) -> int:
+        return hash(self._resolve())
+
+    def __bool__(self) -> bool:
+        return bool(self._resolve())
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._resolve())
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._resolve()
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._resolve()[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._resolve()[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self._resolve()[key]
+
+
+def resolve(obj: T) -> T:
+    """
+    Return the sample object for ``obj`` if it is a :class:`LazyProxy`, making it if necessary,
+    or ``obj`` itself otherwise.
+    """
+    if isinstance(obj, LazyProxy):
+        return cast(T, obj._resolve())
+    return obj
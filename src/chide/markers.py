@@ -8,8 +8,10 @@ T = TypeVar('T')
 class Nested(Generic[T]):
     """Marker produced by :func:`nest`. Resolved to a sample object at make-time."""
 
-    def __init__(self, type_: type[T]) -> None:
+    def __init__(self, type_: type[T], lazy: bool = False, shared: bool = True) -> None:
         self.type_ = type_
+        self.lazy = lazy
+        self.shared = shared
 
 
 class Dynamic(Generic[T]):
@@ -19,15 +21,21 @@ class Dynamic(Generic[T]):
         self.factory = factory
 
 
-def nest(type_: type[T]) -> T:
+def nest(type_: type[T], *, lazy: bool = False, shared: bool = True) -> T:
     """
     Mark a registered type so that it is resolved to a sample object when an
     enclosing sample is made via :meth:`~chide.Collection.make`.
 
     :param type_: The type to resolve via the collection at make-time.
+    :param lazy:
+        If true, the attribute is resolved to a :class:`~chide.lazy.LazyProxy` and the
+        sample object is only made the first time the proxy is used.
+    :param shared:
+        If false, a new sample object will always be made for this attribute, even when
+        the :class:`~chide.Collection` shares nested sample objects.
     :returns: A marker object typed as ``T`` so that mypy accepts it at call sites.
     """
-    return Nested(type_)  # type: ignore[return-value]
+    return Nested(type_, lazy, shared)  # type: ignore[return-value]
 
 
 def call(factory: Callable[[], T]) -> T:
@@ -1,11 +1,129 @@
-from typing import Any, TypeVar, Type, Hashable, cast
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar, Type, Hashable, Iterable, Iterator, Mapping, MutableMapping, cast
+from weakref import KeyedRef
 
 from chide import Collection
-from .typing import Identifier
+from .markers import Nested
+from .typing import Attrs, Identifier, IdentifiedBy
 
 T = TypeVar('T')
 
 
+class LRUObjects(MutableMapping[Hashable, Any]):
+    """
+    Storage for the objects in a :class:`Set` that holds at most ``maxsize`` objects,
+    evicting the least recently used object when that size would be exceeded.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        #: The number of objects that have been evicted.
+        self.evictions = 0
+        #: Called with the key of each object that is evicted.
+        #: This is set by the :class:`Set` using this storage.
+        self.on_evict: Callable[[Hashable], None] | None = None
+        self._objects: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        obj = self._objects[key]
+        self._objects.move_to_end(key)
+        return obj
+
+    def __setitem__(self, key: Hashable, obj: Any) -> None:
+        objects = self._objects
+        objects[key] = obj
+        objects.move_to_end(key)
+        while len(objects) > self.maxsize:
+            evicted, _ = objects.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._objects[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._objects)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+
+class WeakObjects(MutableMapping[Hashable, Any]):
+    """
+    Storage for the objects in a :class:`Set` that only holds weak references to them,
+    so an object is evicted once nothing else refers to it.
+    Objects that cannot be weakly referenced, such as instances of :class:`dict`,
+    cannot be stored.
+    """
+
+    def __init__(self) -> None:
+        #: The number of objects that have been evicted.
+        self.evictions = 0
+        #: Called with the key of each object that is evicted.
+        #: This is set by the :class:`Set` using this storage.
+        self.on_evict: Callable[[Hashable], None] | None = None
+        self._refs: dict[Hashable, KeyedRef[Hashable, Any]] = {}
+
+    def _evicted(self, ref: KeyedRef[Hashable, Any]) -> None:
+        if self._refs.get(ref.key) is ref:
+            del self._refs[ref.key]
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(ref.key)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        obj = self._refs[key]()
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __setitem__(self, key: Hashable, obj: Any) -> None:
+        self._refs[key] = KeyedRef(obj, self._evicted, key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._refs[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._refs))
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+
+class Index:
+    """
+    A hash index of the identities of objects in a :class:`Set` by the values
+    of some of the attributes they were made with.
+    """
+
+    def __init__(self, names: tuple[str, ...]) -> None:
+        self.names = names
+        self.keys: dict[tuple[Any, ...], dict[Hashable, None]] = {}
+        self.values: dict[Hashable, tuple[Any, ...]] = {}
+
+    def add(self, key: Hashable, attrs: Attrs) -> None:
+        self.discard(key)
+        value = tuple([attrs.get(name) for name in self.names])
+        self.values[key] = value
+        self.keys.setdefault(value, {})[key] = None
+
+    def discard(self, key: Hashable) -> None:
+        value = self.values.pop(key, None)
+        if value is not None:
+            keys = self.keys[value]
+            del keys[key]
+            if not keys:
+                del self.keys[value]
+
+    def clear(self) -> None:
+        self.keys.clear()
+        self.values.clear()
+
+    def find(self, value: tuple[Any, ...]) -> list[Hashable]:
+        return list(self.keys.get(value, ()))
+
+
 class Set:
     """
     A collection of sample objects where only one object with
@@ -33,6 +151,29 @@ class Set:
         ``None`` may be returned to indicate that a new object should always
         be returned for the provided parameters.
 
+    :param identified_by:
+        An optional :class:`~chide.typing.IdentifiedBy` callable that takes a `type_`
+        and returns the names of the only attributes ``identify`` needs for that type,
+        or ``None`` if it may need all of them. When names are returned, only those
+        attributes are computed before checking whether an object with that identity
+        already exists, so nested objects and :func:`~chide.call` factories are
+        only resolved when a new object must be made.
+        If not supplied, the :meth:`identified_by` method is used.
+
+    :param objects:
+        The mapping in which to store sample objects by identity. By default, this
+        is a :class:`dict`, but an :class:`LRUObjects` or :class:`WeakObjects` can be
+        used to limit how many objects are kept alive by this set.
+        If the mapping has an ``on_evict`` attribute, it is set to a callable that
+        should be called with the key of each object the mapping evicts, so that
+        this set can forget about that object.
+
+    :param indexes:
+        An optional mapping of types to the attributes of that type on which to
+        index objects in this set so they can be looked up using :meth:`find`.
+        Each index is either the name of an attribute or a tuple of names.
+        Values of indexed attributes must be hashable.
+
     """
 
     #: You may also want to subclass :class:`Set` and implement
@@ -40,13 +181,42 @@ class Set:
     #: for an example.
     identify: Identifier
 
-    def __init__(self, collection: Collection, identify: Identifier | None = None) -> None:
+    def __init__(
+        self,
+        collection: Collection,
+        identify: Identifier | None = None,
+        identified_by: IdentifiedBy | None = None,
+        objects: MutableMapping[Hashable, Any] | None = None,
+        indexes: Mapping[Type[Any], Iterable[str | tuple[str, ...]]] | None = None,
+    ) -> None:
         self.collection = collection
         identify = identify or getattr(self, 'identify', None)
         if identify is None:
             raise TypeError('No identify callable supplied')
         self.identify = identify
-        self.objects: dict[Hashable, Any] = {}
+        self._identified_by = identified_by or self.identified_by
+        self.objects: MutableMapping[Hashable, Any] = {} if objects is None else objects
+        if hasattr(self.objects, 'on_evict'):
+            self.objects.on_evict = self._evicted
+        self._keys: dict[Type[Any], dict[Hashable, None]] = {}
+        self._indexes: dict[Type[Any], dict[frozenset[str], Index]] = {}
+        for type_, names in (indexes or {}).items():
+            type_indexes = self._indexes[type_] = {}
+            for name_or_names in names:
+                index = Index((name_or_names,) if isinstance(name_or_names, str) else name_or_names)
+                type_indexes[frozenset(index.names)] = index
+
+    def identified_by(self, type_: Type[Any]) -> Iterable[str] | None:
+        """
+        Return the names of the attributes needed to identify a sample object of
+        the specified ``type_``. By default, ``None`` is returned, indicating that
+        all attributes are needed, but you may want to implement this in a subclass,
+        see :class:`chide.sqlalchemy.Set` for an example.
+        """
+        return None
+
+    def _nest(self, marker: Nested[Any]) -> Any:
+        return self.get(marker.type_)
 
     def get(self, type_: Type[T], **attrs: Any) -> T:
         """
@@ -60,13 +230,79 @@ class Set:
         this set's :class:`~chide.Collection`, added to the set and then
         returned.
         """
-        attrs = self.collection._attrs(type_, attrs, self.get)
+        plan = self.collection._plan(type_)
+        names = self._identified_by(type_)
+        if names is None:
+            attrs = plan.attrs(attrs, self._nest)
+            key = self.identify(type_, attrs)
+        else:
+            identity = plan.some(names, attrs, self._nest)
+            key = self.identify(type_, identity)
+            if key is not None:
+                obj = self.objects.get(key)
+                if obj is not None:
+                    return cast(T, obj)
+            # make sure anything resolved for the identity is used for the object:
+            attrs.update(identity)
+            attrs = plan.attrs(attrs, self._nest)
         constructor = cast(Type[T], self.collection.constructors.get(type_, type_))
-        key = self.identify(type_, attrs)
         if key is None:
             return constructor(**attrs)
         obj = self.objects.get(key)
         if obj is None:
             obj = constructor(**attrs)
+            self._keys.setdefault(type_, {})[key] = None
+            for index in self._indexes.get(type_, {}).values():
+                index.add(key, attrs)
+            # storing may evict objects, so do it once the object is known to this set:
             self.objects[key] = obj
         return obj
+
+    def _forget(self, type_: Type[Any], key: Hashable) -> None:
+        self._keys.get(type_, {}).pop(key, None)
+        for index in self._indexes.get(type_, {}).values():
+            index.discard(key)
+
+    def _evicted(self, key: Hashable) -> None:
+        for type_, keys in self._keys.items():
+            if key in keys:
+                self._forget(type_, key)
+                break
+
+    def _objects(self, type_: Type[Any], keys: Iterable[Hashable]) -> list[Any]:
+        found = []
+        for key in keys:
+            obj = self.objects.get(key)
+            if obj is None:
+                # evicted from storage, so no longer in this set:
+                self._forget(type_, key)
+            else:
+                found.append(obj)
+        return found
+
+    def find(self, type_: Type[T], **attrs: Any) -> list[T]:
+        """
+        Return the objects of the specified ``type_`` in this set that were made with
+        the attribute values in ``attrs``. There must be an index on exactly the names
+        in ``attrs`` for ``type_``, otherwise a :class:`ValueError` is raised.
+        """
+        index = self._indexes.get(type_, {}).get(frozenset(attrs))
+        if index is None:
+            raise ValueError(f'No index for {type_!r} on {", ".join(map(repr, sorted(attrs)))}')
+        return self._objects(type_, index.find(tuple([attrs[name] for name in index.names])))
+
+    def all(self, type_: Type[T]) -> list[T]:
+        """
+        Return all the objects of the specified ``type_`` in this set,
+        in the order they were added.
+        """
+        return self._objects(type_, list(self._keys.get(type_, ())))
+
+    def clear(self, type_: Type[Any]) -> None:
+        """
+        Remove all the objects of the specified ``type_`` from this set.
+        """
+        for key in self._keys.pop(type_, ()):
+            self.objects.pop(key, None)
+        for index in self._indexes.get(type_, {}).values():
+            index.clear()
@@ -1,4 +1,5 @@
 from typing import Any, Type
+from weakref import WeakKeyDictionary
 
 from sqlalchemy import inspect, Row
 from sqlalchemy.orm import DeclarativeBase
@@ -8,6 +9,18 @@ from .set import Set as BaseSet
 from .typing import Attrs
 
 
+_primary_keys: WeakKeyDictionary[Type[Any], tuple[str, ...]] = WeakKeyDictionary()
+
+
+def _primary_key(type_: Type[Any]) -> tuple[str, ...]:
+    names = _primary_keys.get(type_)
+    if names is None:
+        mapper = inspect(type_)
+        names = tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+        _primary_keys[type_] = names
+    return names
+
+
 class Set(BaseSet):
     """
     A specialised :class:`chide.Set` for getting sample declaratively
@@ -24,15 +37,18 @@ class Set(BaseSet):
         If any element of the primary key is ``None``, a new object
         is always returned.
         """
-        mapper = inspect(type_)
-        key = [type_]
-        for prop in mapper._identity_key_props:
-            value = attrs.get(prop.key)
-            if value is None:
-                # no primary key, so we always get a new object...
-                return None
-            key.append(value)
-        return tuple(key)
+        values = tuple(map(attrs.get, _primary_key(type_)))
+        if None in values:
+            # no primary key, so we always get a new object...
+            return None
+        return (type_, *values)
+
+    @staticmethod
+    def identified_by(type_: Type[Any]) -> tuple[str, ...]:
+        """
+        The primary key attributes are the only ones needed by :meth:`identify`.
+        """
+        return _primary_key(type_)
 
 
 class RowSimplifier(Simplifier[Row[Any]]):
@@ -1,7 +1,11 @@
-from typing import TypeAlias, Any, Callable, Type, Hashable
+from typing import TypeAlias, Any, Callable, Type, Hashable, Iterable
 
 #: A dictionary of attributes that can be used to create a sample object
 Attrs: TypeAlias = dict[str, Any]
 
 #: A callable for uniquely identifying a sample object in a :class:`~chide.Set`
 Identifier: TypeAlias = Callable[[Type[Any], Attrs], Hashable | None]
+
+#: A callable returning the names of the attributes an :data:`Identifier` needs
+#: for a type, or ``None`` if it may need all of them.
+IdentifiedBy: TypeAlias = Callable[[Type[Any]], Iterable[str] | None]
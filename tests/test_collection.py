@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import Type, Annotated, TypeVar, Generic
+from typing import Type, Annotated, TypeVar, Generic, Any
 
 from testfixtures import compare, ShouldRaise
 from unittest import TestCase
 
 from chide import Collection, Set, nest, call
+from chide.lazy import LazyProxy, resolve
 from chide.simplifiers import Simplifier
 from chide.typing import Attrs
 from .helpers import Comparable
@@ -279,3 +280,302 @@ class TestCollection(TestCase):
         obj = collection.bind(Sample[int]).make(Sample)
         compare(obj.a, expected=1)
         assert '__orig_class__' not in obj.__dict__, repr(obj.__dict__)
+
+    def test_plan_reused(self) -> None:
+        collection = Collection({TypeA: {'x': 1, 'y': nest(TypeB)}, TypeB: {'a': 3, 'b': 4}})
+        plan = collection._plan(TypeA)
+        compare(plan.markers, expected=[('y', collection.mapping[TypeA]['y'])])
+        collection.make(TypeA)
+        assert collection._plan(TypeA) is plan
+
+    def test_plan_recompiled_on_add(self) -> None:
+        collection = Collection()
+        collection.add(TypeB(1, 2))
+        compare(collection.make(TypeB), expected=TypeB(1, 2))
+        collection.add(TypeB(3, 4))
+        compare(collection.make(TypeB), expected=TypeB(3, 4))
+
+    def test_plan_recompiled_on_mapping_change(self) -> None:
+        collection = Collection({TypeB: {'a': 1, 'b': 2}})
+        compare(collection.make(TypeB), expected=TypeB(1, 2))
+        collection.mapping[TypeB] = {'a': 3, 'b': call(lambda: 4)}
+        compare(collection.make(TypeB), expected=TypeB(3, 4))
+        collection.mapping = {TypeB: {'a': 5, 'b': 6}}
+        compare(collection.make(TypeB), expected=TypeB(5, 6))
+
+    def test_plan_invalidate_after_in_place_change(self) -> None:
+        collection = Collection({TypeA: {'x': 1, 'y': 2}, TypeB: {'a': 3, 'b': 4}})
+        compare(collection.make(TypeA), expected=TypeA(1, 2))
+        collection.mapping[TypeA]['y'] = nest(TypeB)
+        collection.invalidate(TypeA)
+        compare(collection.make(TypeA), expected=TypeA(1, TypeB(3, 4)))
+        collection.mapping[TypeA]['y'] = 5
+        collection.invalidate()
+        compare(collection.make(TypeA), expected=TypeA(1, 5))
+
+    def test_make_many(self) -> None:
+        counter = iter(range(100))
+        collection = Collection(
+            {TypeA: {'x': call(lambda: next(counter)), 'y': nest(TypeB)}, TypeB: {'a': 3, 'b': 4}}
+        )
+        actual = collection.make_many(TypeA, 3, y=0)
+        compare(actual, expected=[TypeA(0, 0), TypeA(1, 0), TypeA(2, 0)])
+
+    def test_make_many_nested(self) -> None:
+        collection = Collection({TypeA: {'x': 1, 'y': nest(TypeB)}, TypeB: {'a': 3, 'b': 4}})
+        actual = collection.make_many(TypeA, 2)
+        compare(actual, expected=[TypeA(1, TypeB(3, 4)), TypeA(1, TypeB(3, 4))])
+        assert actual[0].y is not actual[1].y
+
+    def test_make_many_none(self) -> None:
+        collection = Collection({TypeB: {'a': 3, 'b': 4}})
+        compare(collection.make_many(TypeB, 0), expected=[])
+
+    def test_make_each(self) -> None:
+        collection = Collection({TypeB: {'a': 3, 'b': 4}})
+        actual = collection.make_each(TypeB, ({'a': i} for i in range(3)))
+        compare(actual, expected=[TypeB(0, 4), TypeB(1, 4), TypeB(2, 4)])
+
+    def test_make_each_with_constructor(self) -> None:
+        T = TypeVar('T')
+
+        class Sample(Generic[T]):
+            def __init__(self, a: T) -> None:
+                self.a = a
+
+        collection = Collection()
+        collection.add(Sample[int](1), annotated=Sample[int], constructor=Sample)
+        actual = collection.make_each(Sample[int], [{}, {'a': 2}])
+        compare([obj.a for obj in actual], expected=[1, 2])
+        assert '__orig_class__' not in actual[0].__dict__
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+    label: str = 'origin'
+
+
+class Slotted:
+    __slots__ = ('a', 'b', 'c')
+
+    def __init__(self, a: int, b: 'TypeB | int', *, c: int = 0) -> None:
+        self.a, self.b, self.c = a, b, c
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is Slotted and (self.a, self.b, self.c) == (other.a, other.b, other.c)
+
+    def __repr__(self) -> str:
+        return f'<Slotted: a={self.a!r}, b={self.b!r}, c={self.c!r}>'
+
+
+class TestCompiledCollection(TestCase):
+    def test_dataclass(self) -> None:
+        collection = Collection({Point: {'x': 1, 'y': 2}}, compiled=True)
+        compare(collection.make(Point), expected=Point(1, 2))
+        compare(collection.make(Point, y=3), expected=Point(1, 3))
+        compare(collection.make(Point, label='other'), expected=Point(1, 2, 'other'))
+
+    def test_slots_with_markers(self) -> None:
+        counter = iter(range(100))
+        collection = Collection(
+            {Slotted: {'a': 1, 'b': nest(TypeB), 'c': call(lambda: next(counter))}, TypeB: {'a': 3, 'b': 4}},
+            compiled=True,
+        )
+        compare(collection.make(Slotted), expected=Slotted(1, TypeB(3, 4), c=0))
+        compare(collection.make(Slotted, b=2), expected=Slotted(1, 2, c=1))
+
+    def test_overrides_skip_markers(self) -> None:
+        collection = Collection(
+            {Slotted: {'a': 1, 'b': nest(TypeB), 'c': call(lambda: 1 / 0)}}, compiled=True
+        )
+        compare(collection.make(Slotted, b=2, c=3), expected=Slotted(1, 2, c=3))
+
+    def test_var_keyword(self) -> None:
+        calls = []
+
+        class Sample:
+            def __init__(self, *args: Any, **kw: Any) -> None:
+                calls.append((args, kw))
+
+        collection = Collection({Sample: {'a': 1, 'b': 2}}, compiled=True)
+        collection.make(Sample)
+        collection.make(Sample, c=3)
+        compare(calls, expected=[((), {'a': 1, 'b': 2}), ((), {'a': 1, 'b': 2, 'c': 3})])
+
+    def test_unexpected_attributes_on_construction(self) -> None:
+        with ShouldRaise(TypeError(f"{Point!r} does not accept sample attributes: 'z'")):
+            Collection({Point: {'x': 1, 'y': 2, 'z': 3}}, compiled=True)
+
+    def test_unexpected_attributes_on_add(self) -> None:
+        collection = Collection(compiled=True)
+        with ShouldRaise(TypeError(f"{TypeB!r} does not accept sample attributes: 'c'")):
+            collection.add({'a': 1, 'b': 2, 'c': 3}, annotated=TypeB)
+
+    def test_keyword_only_not_positional(self) -> None:
+        collection = Collection({Slotted: {'c': 3, 'a': 1}}, compiled=True)
+        compare(collection.make(Slotted, b=2), expected=Slotted(1, 2, c=3))
+
+    def test_no_signature(self) -> None:
+        collection = Collection({dict: {'x': 1}}, compiled=True)
+        compare(collection.make(dict, y=2), expected={'x': 1, 'y': 2})
+
+    def test_constructor(self) -> None:
+        T = TypeVar('T')
+
+        class Sample(Generic[T]):
+            def __init__(self, a: T) -> None:
+                self.a = a
+
+        collection = Collection(compiled=True)
+        collection.add(Sample[int](1), annotated=Sample[int], constructor=Sample)
+        obj = collection.make(Sample[int])
+        compare(obj.a, expected=1)
+        assert '__orig_class__' not in obj.__dict__
+
+    def test_generic_alias(self) -> None:
+        T = TypeVar('T')
+
+        class Sample(Generic[T]):
+            def __init__(self, a: T, b: int) -> None:
+                self.a, self.b = a, b
+
+        collection = Collection({Sample[int]: {'a': 1, 'b': 2}}, compiled=True)
+        obj = collection.make(Sample[int], b=3)
+        compare((obj.a, obj.b), expected=(1, 3))
+        with ShouldRaise(TypeError(f"{Sample[int]!r} does not accept sample attributes: 'c'")):
+            Collection({Sample[int]: {'a': 1, 'b': 2, 'c': 3}}, compiled=True)
+
+    def test_keys_not_identifiers(self) -> None:
+        class Sample:
+            def __init__(self, **kw: Any) -> None:
+                self.kw = kw
+
+        collection = Collection({Sample: {'a': 1, 'not-a-name': 2, 'class': 3}}, compiled=True)
+        compare(collection.make(Sample, b=4).kw, expected={'a': 1, 'not-a-name': 2, 'class': 3, 'b': 4})
+
+    def test_make_each(self) -> None:
+        collection = Collection({Point: {'x': 1, 'y': 2}}, compiled=True)
+        actual = collection.make_each(Point, [{}, {'x': 3}, {'label': 'l'}])
+        compare(actual, expected=[Point(1, 2), Point(3, 2), Point(1, 2, 'l')])
+
+
+class TestLazyNesting(TestCase):
+    def test_made_on_first_use(self) -> None:
+        made = []
+
+        class Lazy(TypeB):
+            def __init__(self, a: int, b: int) -> None:
+                made.append(a)
+                super().__init__(a, b)
+
+        collection = Collection({TypeA: {'x': 1, 'y': nest(Lazy, lazy=True)}, Lazy: {'a': 3, 'b': 4}})
+        obj = collection.make(TypeA)
+        compare(made, expected=[])
+        y: Any = obj.y
+        compare(y.a, expected=3)
+        compare(y.b, expected=4)
+        compare(made, expected=[3])
+        assert isinstance(y, Lazy)
+        compare(resolve(y), expected=Lazy(3, 4))
+
+    def test_override_skips_proxy(self) -> None:
+        collection = Collection({TypeA: {'x': 1, 'y': nest(TypeB, lazy=True)}})
+        compare(collection.make(TypeA, y=2), expected=TypeA(1, 2))
+
+    def test_compiled(self) -> None:
+        collection = Collection(
+            {Slotted: {'a': 1, 'b': nest(TypeB, lazy=True)}, TypeB: {'a': 3, 'b': 4}}, compiled=True
+        )
+        b: Any = collection.make(Slotted).b
+        assert type(b) is LazyProxy
+        compare(resolve(b), expected=TypeB(3, 4))
+
+    def test_set(self) -> None:
+        type_c = make_type_c()
+        collection = Collection({TypeA: {'x': 1, 'y': nest(type_c, lazy=True)}, type_c: {'key': 1}})
+        samples = Set(collection, lambda type_, attrs: attrs.get('key'))
+        obj1 = samples.get(TypeA)
+        obj2 = samples.get(TypeA)
+        compare(type_c.seen, expected=set())
+        assert resolve(obj1.y) is resolve(obj2.y)
+        compare(type_c.seen, expected={1})
+
+
+class Account(Comparable):
+    def __init__(self, number: int) -> None:
+        self.number = number
+
+
+class Child(Comparable):
+    def __init__(self, name: str, account: Account) -> None:
+        self.name, self.account = name, account
+
+
+class Parent(Comparable):
+    def __init__(self, first: Child, second: Child, account: Account) -> None:
+        self.first, self.second, self.account = first, second, account
+
+
+class TestSharedNesting(TestCase):
+    def make_collection(self, account: Any = None, shared: bool = True, compiled: bool = False) -> Collection:
+        return Collection(
+            {
+                Parent: {
+                    'first': nest(Child),
+                    'second': nest(Child),
+                    'account': account or nest(Account),
+                },
+                Child: {'name': 'kid', 'account': nest(Account)},
+                Account: {'number': call(iter(range(100)).__next__)},
+            },
+            shared=shared,
+            compiled=compiled,
+        )
+
+    def test_not_shared_by_default(self) -> None:
+        parent = self.make_collection(shared=False).make(Parent)
+        compare([parent.first.account.number, parent.second.account.number], expected=[0, 1])
+        compare(parent.account.number, expected=2)
+
+    def test_shared(self) -> None:
+        parent = self.make_collection().make(Parent)
+        assert parent.first is parent.second
+        assert parent.first.account is parent.account
+
+    def test_shared_only_within_one_make(self) -> None:
+        collection = self.make_collection()
+        parent1 = collection.make(Parent)
+        parent2 = collection.make(Parent)
+        assert parent1.account is not parent2.account
+        compare([parent1.account.number, parent2.account.number], expected=[0, 1])
+
+    def test_opt_out(self) -> None:
+        parent = self.make_collection(account=nest(Account, shared=False)).make(Parent)
+        assert parent.first.account is parent.second.account
+        assert parent.account is not parent.first.account
+
+    def test_override_not_shared(self) -> None:
+        account = Account(42)
+        parent = self.make_collection().make(Parent, account=account)
+        assert parent.first.account is not account
+
+    def test_lazy(self) -> None:
+        collection = self.make_collection(account=nest(Account, lazy=True))
+        parent = collection.make(Parent)
+        assert resolve(parent.account) is parent.first.account
+
+    def test_compiled(self) -> None:
+        parent = self.make_collection(compiled=True).make(Parent)
+        assert parent.first is parent.second
+        assert parent.first.account is parent.account
+
+    def test_make_each(self) -> None:
+        parents = self.make_collection().make_each(Parent, [{}, {}])
+        assert parents[0].first is parents[0].second
+        assert parents[0].first is not parents[1].first
+
+    def test_attributes(self) -> None:
+        attrs = self.make_collection().attributes(Parent)
+        assert attrs['first'].account is attrs['account']
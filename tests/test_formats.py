@@ -1,9 +1,39 @@
+import re
+import sys
+from array import array
+from ast import literal_eval
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, time, datetime
+from importlib import import_module, reload
+from io import StringIO
+from pathlib import Path
+from pickle import dumps, loads
+from threading import Thread
 from textwrap import dedent
+from types import ModuleType
+from typing import Any, Iterator
 
-from testfixtures import compare
+import pytest
+from testfixtures import compare, ShouldRaise
 
-from chide.formats import PrettyFormat, HEADER, ROW, CSVFormat
+from chide.formats import (
+    PrettyFormat,
+    HEADER,
+    ROW,
+    CSVFormat,
+    default_parse,
+    infer_parse,
+    Schema,
+    Row,
+    PrettyRows,
+    row_type,
+    ParseCache,
+    DiskCache,
+    mapped_lines,
+    compare_tables,
+    _numpy,
+    _submit_chunks,
+)
 
 
 class TestPrettyFormat:
@@ -484,6 +514,204 @@ class TestPrettyFormat:
         rendered = pretty.render(parsed)
         compare(expected=source, actual=rendered)
 
+    def test_iter_parse_text(self) -> None:
+        pretty = PrettyFormat()
+        rows = pretty.iter_parse(
+            """
+            +---+------+
+            | x | y    |
+            +---+------+
+            | 1 | foo  |
+            | 2 | bar  |
+            +---+------+
+            """
+        )
+        compare(next(rows), expected={'x': 1, 'y': 'foo'})
+        compare(list(rows), expected=[{'x': 2, 'y': 'bar'}])
+
+    def test_iter_parse_file(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        source = StringIO(
+            dedent("""\
+            +-------+-----+
+            | x     | y   |
+            +-------+-----+
+            | float | str |
+            +-------+-----+
+            | 1     | foo |
+            +-------+-----+
+            """)
+        )
+        compare(pretty.iter_parse(source), expected=[{'x': 1.0, 'y': 'foo'}])
+
+    def test_parse_file(self) -> None:
+        pretty = PrettyFormat()
+        source = StringIO(
+            dedent("""\
+            +---+------+
+            | x | y    |
+            +---+------+
+            | 1 | foo  |
+            +---+------+
+            """)
+        )
+        actual = pretty.parse_file(source)
+        compare(actual, expected=[{'x': 1, 'y': 'foo'}])
+        compare(actual.widths, expected={'x': 1, 'y': 4})
+
+    def test_render_minimum_column_widths_in_different_order(self) -> None:
+        pretty = PrettyFormat(minimum_column_widths={'y': 4})
+        compare(
+            pretty.render([{'x': 1, 'y': 'foo'}]),
+            expected=dedent("""\
+            +---+------+
+            | x | y    |
+            +---+------+
+            | 1 | foo  |
+            +---+------+
+            """),
+        )
+
+    def test_render_mixed_types_in_column(self) -> None:
+        pretty = PrettyFormat(type_render={float: '{:.2f}'.format}, column_render={'y': str.upper})
+        actual = pretty.render([{'x': 1, 'y': 'a'}, {'x': 2.5, 'y': 'bb'}, {'x': 3, 'y': 'c'}])
+        compare(
+            actual,
+            expected=dedent("""\
+            +------+----+
+            | x    | y  |
+            +------+----+
+            | 1    | A  |
+            | 2.50 | BB |
+            | 3    | C  |
+            +------+----+
+            """),
+        )
+
+    def test_fixed_width_parse(self) -> None:
+        pretty = PrettyFormat(fixed_width=True)
+        actual = pretty.parse("""
+            +---+---------+
+            | x | y       |
+            +---+---------+
+            | 1 | foo|bar |
+            | 2 |         |
+            +---+---------+
+            """)
+        compare(list(actual), expected=[{'x': 1, 'y': 'foo|bar'}, {'x': 2, 'y': ''}])
+        compare(actual.widths, expected={'x': 1, 'y': 7})
+
+    def test_fixed_width_row_not_matching_divider(self) -> None:
+        pretty = PrettyFormat(fixed_width=True)
+        actual = pretty.parse("""
+            | x | y   |
+            +---+-----+
+            | 1 | foo |
+            | 20 | barbaz |
+            +---+-----+
+            """)
+        compare(list(actual), expected=[{'x': 1, 'y': 'foo'}, {'x': 20, 'y': 'barbaz'}])
+        compare(actual.widths, expected={'x': 2, 'y': 6})
+
+    def test_fixed_width_no_padding(self) -> None:
+        pretty = PrettyFormat(fixed_width=True, padding=0)
+        actual = pretty.parse("""
+            +-+---+
+            |x|y  |
+            +-+---+
+            |1|a|b|
+            +-+---+
+            """)
+        compare(list(actual), expected=[{'x': 1, 'y': 'a|b'}])
+        compare(actual.widths, expected={'x': 1, 'y': 3})
+
+    def test_fixed_width_round_trip(self) -> None:
+        pretty = PrettyFormat(fixed_width=True, types_location=ROW)
+        attrs = [{'x': 1, 'y': 'a | b'}, {'x': 20, 'y': '|'}]
+        parsed = pretty.parse(pretty.render(attrs))
+        compare(list(parsed), expected=attrs)
+
+    def test_render_to(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        attrs = [{'x': 1, 'y': 'foo'}, {'x': 2000, 'y': 'b'}]
+        output = StringIO()
+        pretty.render_to(output, attrs)
+        compare(
+            output.getvalue(),
+            expected=dedent("""\
+            +------+-----+
+            | x    | y   |
+            +------+-----+
+            | int  | str |
+            +------+-----+
+            | 1    | foo |
+            | 2000 | b   |
+            +------+-----+
+            """),
+        )
+
+    def test_render_to_matches_render(self) -> None:
+        pretty = PrettyFormat(types_location=HEADER, minimum_column_widths={'x': 5})
+        attrs: list[dict[str, Any]] = [{'x': 1, 'y': 'foo'}, {'x': None, 'y': ' bar', 'z': 3}]
+        ref: list[dict[str, Any]] = [{'z': 0, 'x': 0}]
+        for ref_ in None, ref, pretty.parse(pretty.render(ref)):
+            output = StringIO()
+            pretty.render_to(output, attrs, ref_)
+            compare(output.getvalue(), expected=pretty.render(attrs, ref_))
+
+    def test_render_to_empty(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        for single_pass in False, True:
+            output = StringIO()
+            pretty.render_to(output, [], single_pass=single_pass)
+            compare(output.getvalue(), expected='+\n+\n')
+
+    def test_render_to_iterator(self) -> None:
+        output = StringIO()
+        with ShouldRaise(TypeError('Iterators can only be rendered with single_pass=True')):
+            PrettyFormat().render_to(output, (attrs for attrs in [{'x': 1}]))
+        compare(output.getvalue(), expected='')
+
+    def test_render_to_single_pass(self) -> None:
+        pretty = PrettyFormat(minimum_column_widths={'y': 4})
+        attrs = iter([{'x': 1, 'y': 'foo'}, {'x': 20, 'y': 'barbaz'}])
+        output = StringIO()
+        pretty.render_to(output, attrs, single_pass=True)
+        compare(
+            output.getvalue(),
+            expected=dedent("""\
+            +---+------+
+            | x | y    |
+            +---+------+
+            | 1 | foo  |
+            | 20 | barbaz |
+            +---+------+
+            """),
+        )
+
+    def test_render_to_single_pass_widths_from_reference(self) -> None:
+        pretty = PrettyFormat()
+        ref = pretty.parse("""
+            +----+--------+
+            | x  | y      |
+            +----+--------+
+            | 10 | barbaz |
+            +----+--------+
+            """)
+        output = StringIO()
+        pretty.render_to(output, iter([{'y': 'foo', 'x': 1}, {'x': 20, 'y': 'bar'}]), ref, single_pass=True)
+        compare(
+            output.getvalue(),
+            expected=dedent("""\
+            +----+--------+
+            | x  | y      |
+            +----+--------+
+            | 1  | foo    |
+            | 20 | bar    |
+            +----+--------+
+            """),
+        )
+
 
 class TestCSVFormat:
     def test_parse_minimal(self) -> None:
@@ -496,6 +724,17 @@ class TestCSVFormat:
             ],
         )
 
+    def test_iter_parse(self) -> None:
+        format_ = CSVFormat()
+        rows = format_.iter_parse('x,y\n1,foo\n2,"bar\nbaz"\n')
+        compare(next(rows), expected={'x': 1, 'y': 'foo'})
+        compare(list(rows), expected=[{'x': 2, 'y': 'bar\nbaz'}])
+
+    def test_parse_file(self) -> None:
+        format_ = CSVFormat(types_location=HEADER)
+        actual = format_.parse_file(StringIO('x (float),y\r\n1,foo\r\n'))
+        compare(actual, expected=[{'x': 1.0, 'y': 'foo'}])
+
     def test_render_minimal(self) -> None:
         format_ = CSVFormat()
         actual = format_.render(
@@ -524,6 +763,29 @@ class TestCSVFormat:
         expected = "".join(('x,y\r\n', '1,foo\r\n'))
         compare(expected=expected, actual=actual, show_whitespace=True)
 
+    def test_writer(self) -> None:
+        format_ = CSVFormat(types_location=ROW)
+        output = StringIO()
+        writer = format_.writer(output)
+        compare(output.getvalue(), expected='')
+        writer.write_rows([])
+        compare(output.getvalue(), expected='')
+        writer.write_row({'x': 1, 'y': 'foo'})
+        compare(output.getvalue(), expected='x,y\r\nint,str\r\n1,foo\r\n')
+        writer.write_rows(iter([{'x': 2, 'y': 'bar'}, {'x': 3, 'z': 'baz'}]))
+        compare(
+            output.getvalue(),
+            expected='x,y\r\nint,str\r\n1,foo\r\n2,bar\r\n3,None\r\n',
+            show_whitespace=True,
+        )
+
+    def test_writer_with_reference(self) -> None:
+        format_ = CSVFormat(types_location=HEADER, column_render={'y': str.upper})
+        output = StringIO()
+        writer = format_.writer(output, ref=[{'y': 'a', 'x': 0}])
+        writer.write_rows({'x': i, 'y': 'a'} for i in range(2))
+        compare(output.getvalue(), expected='y (str),x (int)\r\nA,0\r\nA,1\r\n', show_whitespace=True)
+
     def test_roundtrip_minimal(self) -> None:
         source = "".join(('x,y\r\n', '1,foo\r\n'))
         format_ = CSVFormat()
@@ -610,3 +872,1093 @@ class TestCSVFormat:
         )
         rendered = format_.render(parsed)
         compare(expected=source, actual=rendered, show_whitespace=True)
+
+
+class TestDefaultParse:
+    def check(self, *cases: str) -> None:
+        def literal_or_text(text: str) -> Any:
+            try:
+                return literal_eval(text)
+            except (SyntaxError, ValueError):
+                return text
+
+        expected = [(text, literal_or_text(text)) for text in cases]
+        actual = [(text, default_parse(text)) for text in cases]
+        compare(expected=expected, actual=actual, strict=True)
+
+    def test_ints(self) -> None:
+        self.check('1', '-1', '+1', '0', '-0', '00', '01', '1_000', '0x10', '12345678901234567890')
+
+    def test_floats(self) -> None:
+        self.check('1.', '.5', '-.5', '1.5', '-0.0', '1e5', '1E-5', '1.5e+3', '1.5e', '1.5.5', '1j')
+
+    def test_constants(self) -> None:
+        self.check('None', 'True', 'False', 'True ', ' True', '\nNone', 'None # comment')
+
+    def test_text(self) -> None:
+        self.check(
+            '',
+            'foo',
+            'foo, bar',
+            'foo bar',
+            'San Francisco',
+            '2004-01-01',
+            'inf',
+            'x.y',
+            'a+b',
+            'é',
+            '-',
+            '.',
+        )
+
+    def test_quoted(self) -> None:
+        self.check("'a'", '" bar"', "b'x'", "'foo' 'bar'")
+
+    def test_containers(self) -> None:
+        self.check(
+            '[1, 2]', '(1,)', '{1: 2}', 'set()', 'None, 1', 'True,False', 'None,', 'False, None', 'a, b'
+        )
+
+    def test_mutable_results_not_shared(self) -> None:
+        first = default_parse('[1]')
+        second = default_parse('[1]')
+        compare(first, expected=[1])
+        assert first is not second
+
+
+class TestInferTypes:
+    def test_infer_parse(self) -> None:
+        compare(repr(infer_parse(['1', '-2'])), expected='<InferredParse: int>')
+        compare(repr(infer_parse(['1', '2.5'])), expected='<InferredParse: float>')
+        compare(repr(infer_parse(['2024-01-02', ''])), expected='<InferredParse: date>')
+        compare(repr(infer_parse(['2024-01-02 03:04'])), expected='<InferredParse: datetime>')
+        compare(repr(infer_parse(['True', 'None'])), expected='<InferredParse: bool>')
+        compare(repr(infer_parse(['foo', 'bar baz'])), expected='<InferredParse: str>')
+
+    def test_infer_parse_no_match(self) -> None:
+        assert infer_parse(['1', 'foo']) is default_parse
+        assert infer_parse(['[1]']) is default_parse
+        assert infer_parse(['', 'None']) is default_parse
+
+    def test_pretty(self) -> None:
+        pretty = PrettyFormat(infer_types=2)
+        actual = pretty.parse("""
+            +---+-----+------------+-----+
+            | a | b   | c          | d   |
+            +---+-----+------------+-----+
+            | 1 | 1.5 | 2024-01-02 | foo |
+            | 2 | 2   | 2024-01-03 | bar |
+            | 3 | 3   | 2024-01-04 | baz |
+            +---+-----+------------+-----+
+            """)
+        compare(
+            list(actual),
+            expected=[
+                {'a': 1, 'b': 1.5, 'c': date(2024, 1, 2), 'd': 'foo'},
+                {'a': 2, 'b': 2.0, 'c': date(2024, 1, 3), 'd': 'bar'},
+                {'a': 3, 'b': 3.0, 'c': date(2024, 1, 4), 'd': 'baz'},
+            ],
+            strict=True,
+        )
+        compare(actual.widths, expected={'a': 1, 'b': 3, 'c': 10, 'd': 3})
+
+    def test_fallback_for_cells_that_do_not_fit(self) -> None:
+        format_ = CSVFormat(infer_types=1)
+        actual = format_.parse('x,y\n1,2024-01-02\nNone,2024-02-30\n[3],foo\n')
+        compare(
+            actual,
+            expected=[
+                {'x': 1, 'y': date(2024, 1, 2)},
+                {'x': None, 'y': '2024-02-30'},
+                {'x': [3], 'y': 'foo'},
+            ],
+            strict=True,
+        )
+
+    def test_text_does_not_become_constant(self) -> None:
+        format_ = CSVFormat(infer_types=1)
+        compare(format_.parse('x\nfoo\nTrue\n1\n'), expected=[{'x': 'foo'}, {'x': True}, {'x': 1}])
+
+    def test_explicit_parsers_not_inferred(self) -> None:
+        format_ = CSVFormat(column_parse={'x': str}, types_location=HEADER, infer_types=5)
+        actual = format_.parse('x,y (float),z\n1,2,3\n')
+        compare(actual, expected=[{'x': '1', 'y': 2.0, 'z': 3}], strict=True)
+
+    def test_fewer_rows_than_samples(self) -> None:
+        format_ = CSVFormat(infer_types=100)
+        rows = format_.iter_parse('x,y\n1,2024-01-02\n2,2024-01-03\n')
+        compare(list(rows), expected=[{'x': 1, 'y': date(2024, 1, 2)}, {'x': 2, 'y': date(2024, 1, 3)}])
+
+    def test_no_rows(self) -> None:
+        compare(CSVFormat(infer_types=10).parse('x,y\n'), expected=[])
+        compare(CSVFormat(infer_types=10).parse(''), expected=[])
+
+    def test_short_rows(self) -> None:
+        format_ = CSVFormat(infer_types=2)
+        compare(format_.parse('x,y\n1\n2,3\n'), expected=[{'x': 1}, {'x': 2, 'y': 3}])
+
+
+class TestSchema:
+    def test_parse_does_not_change_format(self) -> None:
+        format_ = CSVFormat(types_location=HEADER)
+        compare(format_.parse('x (float)\n1\n'), expected=[{'x': 1.0}], strict=True)
+        compare(format_.column_parse, expected={})
+        compare(format_.parse('x\n1\n'), expected=[{'x': 1}], strict=True)
+
+    def test_build_from_header(self) -> None:
+        format_ = CSVFormat(types_location=HEADER, column_parse={'z': str})
+        schema = format_.schema('x (float),y,z (int)\n1,2,3\n')
+        compare(schema.columns, expected=('x', 'y', 'z'))
+        compare(schema.parsers, expected=(float, default_parse, str))
+        compare(repr(schema), expected='<Schema: x, y, z>')
+
+    def test_build_from_types_row(self) -> None:
+        format_ = PrettyFormat(types_location=ROW, type_parse={'bytes': str.encode})
+        schema = format_.schema(
+            StringIO(
+                dedent("""\
+                +-------+-------+-----+
+                | x     | y     | z   |
+                +-------+-------+-----+
+                | float | bytes |     |
+                +-------+-------+-----+
+                """)
+            )
+        )
+        compare(schema, expected=Schema(('x', 'y', 'z'), (float, str.encode, default_parse)))
+
+    def test_build_from_empty(self) -> None:
+        with ShouldRaise(ValueError('No columns found')):
+            CSVFormat().schema('')
+
+    def test_parse_with_schema(self) -> None:
+        format_ = CSVFormat(types_location=ROW)
+        schema = Schema(('x', 'y'), (float, str))
+        actual = format_.parse('x,y\nint,int\n1,2\n', schema=schema)
+        compare(actual, expected=[{'x': 1.0, 'y': '2'}], strict=True)
+
+    def test_parse_pretty_with_schema(self) -> None:
+        format_ = PrettyFormat(types_location=HEADER)
+        schema = Schema(('x', 'y'), (float, str))
+        actual = format_.parse(
+            """
+            +---------+---+
+            | x (int) | y |
+            +---------+---+
+            | 1       | 2 |
+            +---------+---+
+            """,
+            schema=schema,
+        )
+        compare(list(actual), expected=[{'x': 1.0, 'y': '2'}], strict=True)
+        compare(actual.widths, expected={'x': 7, 'y': 1})
+
+    def test_parse_file_with_schema(self) -> None:
+        format_ = CSVFormat()
+        schema = format_.schema('x,y\n')
+        compare(format_.parse_file(StringIO('x,y\n1,2\n'), schema), expected=[{'x': 1, 'y': 2}])
+
+    def test_columns_do_not_match(self) -> None:
+        format_ = CSVFormat()
+        with ShouldRaise(ValueError("Columns ['x', 'z'] do not match schema columns ['x', 'y']")):
+            format_.parse('x,z\n1,2\n', schema=Schema(('x', 'y'), (int, int)))
+
+    def test_immutable(self) -> None:
+        schema = Schema(('x',), (int,))
+        with ShouldRaise(AttributeError('Schema is immutable')):
+            schema.columns = ('y',)
+        with ShouldRaise(AttributeError('Schema is immutable')):
+            del schema.parsers
+        compare(schema.columns, expected=('x',))
+
+    def test_mismatched_lengths(self) -> None:
+        with ShouldRaise(ValueError('2 columns but 1 parsers')):
+            Schema(('x', 'y'), (int,))
+
+    def test_equality(self) -> None:
+        schema = Schema(('x',), (int,))
+        assert schema == Schema(('x',), (int,))
+        assert schema != Schema(('y',), (int,))
+        assert schema != Schema(('x',), (float,))
+        assert schema != ('x',)
+        compare(hash(schema), expected=hash(Schema(('x',), (int,))))
+
+    def test_pickle(self) -> None:
+        schema = Schema(('x', 'y'), (float, default_parse))
+        compare(loads(dumps(schema)), expected=schema)
+
+    def test_shared_between_threads(self) -> None:
+        format_ = CSVFormat(types_location=HEADER)
+        schema = format_.schema('x (float),y\n')
+        results: dict[int, list[Any]] = {}
+
+        def parse(i: int) -> None:
+            results[i] = format_.parse(f'x (float),y\n{i},{i}\n', schema)
+
+        threads = [Thread(target=parse, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        compare(results, expected={i: [{'x': float(i), 'y': i}] for i in range(10)})
+
+
+class TestCompactRows:
+    def test_pretty(self) -> None:
+        pretty = PrettyFormat()
+        actual = pretty.parse(
+            """
+            +---+------+
+            | x | y    |
+            +---+------+
+            | 1 | foo  |
+            | 2 | bar  |
+            +---+------+
+            """,
+            compact=True,
+        )
+        assert isinstance(actual, PrettyRows)
+        compare([dict(row.items()) for row in actual], expected=[{'x': 1, 'y': 'foo'}, {'x': 2, 'y': 'bar'}])
+        compare(actual.widths, expected={'x': 1, 'y': 4})
+        assert type(actual[0]) is type(actual[1])
+
+    def test_csv(self) -> None:
+        actual = CSVFormat(types_location=HEADER).parse('x (float),y\n1,foo\n', compact=True)
+        compare(actual, expected=[(1.0, 'foo')])
+        assert isinstance(actual[0], Row)
+
+    def test_iter_parse_file(self) -> None:
+        rows = CSVFormat(infer_types=1).iter_parse(StringIO('x,y\n1,2\n3,4\n'), compact=True)
+        compare(list(rows), expected=[(1, 2), (3, 4)])
+
+    def test_row(self) -> None:
+        row = row_type(('x', 'y'))((1, 'foo'))
+        compare(row['x'], expected=1)
+        compare(row[1], expected='foo')
+        compare(row[:1], expected=(1,))
+        compare(row.get('y'), expected='foo')
+        compare(row.get('z'), expected=None)
+        compare(row.get('z', 0), expected=0)
+        compare(row.keys(), expected=('x', 'y'))
+        compare(row.values(), expected=(1, 'foo'))
+        compare(list(row.items()), expected=[('x', 1), ('y', 'foo')])
+        compare(repr(row), expected="Row(x=1, y='foo')")
+        with ShouldRaise(KeyError('z')):
+            row['z']
+
+    def test_equality(self) -> None:
+        row = row_type(('a', 'b'))((1, 2))
+        assert row == row_type(('a', 'b'))((1, 2))
+        assert not row != row_type(('a', 'b'))((1, 2))
+        assert row != row_type(('b', 'a'))((1, 2))
+        assert row != row_type(('a', 'b'))((1, 3))
+        assert row != row_type(('a', 'b', 'c'))((1, 2, 3))
+        assert row != (1, 2)
+        assert (1, 2) != row
+        assert row != {'a': 1, 'b': 2}
+        compare(hash(row), expected=hash(row_type(('a', 'b'))((1, 2))))
+        assert hash(row) != hash(row_type(('b', 'a'))((1, 2)))
+        compare(len({row, row_type(('b', 'a'))((1, 2))}), expected=2)
+
+    def test_iteration_over_values(self) -> None:
+        row = row_type(('x', 'y'))((1, 'foo'))
+        compare(list(row), expected=[1, 'foo'])
+        assert 'foo' in row
+        assert 'x' not in row
+
+    def test_short_row(self) -> None:
+        row = CSVFormat().parse('x,y\n1\n', compact=True)[0]
+        compare(row.keys(), expected=('x',))
+        compare(row.get('y'), expected=None)
+        with ShouldRaise(KeyError('y')):
+            row['y']
+
+    def test_row_type_shared(self) -> None:
+        assert row_type(('x', 'y')) is row_type(('x', 'y'))
+        assert row_type(('x', 'y')) is not row_type(('y', 'x'))
+
+    def test_row_has_no_dict(self) -> None:
+        row = row_type(('x',))((1,))
+        assert not hasattr(row, '__dict__')
+
+    def test_pickle(self) -> None:
+        row = row_type(('x', 'y'))((1, 'foo'))
+        loaded = loads(dumps(row))
+        compare(loaded, expected=row)
+        assert type(loaded) is type(row)
+
+    def test_pretty_render_round_trip(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        source = dedent("""\
+            +-----+-----+
+            | x   | y   |
+            +-----+-----+
+            | int | str |
+            +-----+-----+
+            | 1   | a   |
+            | 2   | b   |
+            +-----+-----+
+            """)
+        parsed = pretty.parse(source, compact=True)
+        compare(pretty.render(parsed), expected=source)
+        compare(pretty.render([{'x': 3, 'y': 'c'}], ref=parsed), expected=pretty.render([{'x': 3, 'y': 'c'}]))
+
+    def test_csv_render_round_trip(self) -> None:
+        format_ = CSVFormat(types_location=ROW)
+        source = 'x,y\r\nint,str\r\n1,a\r\n'
+        parsed = format_.parse(source, compact=True)
+        compare(format_.render(parsed), expected=source)
+        compare(format_.render([{'y': 'b', 'x': 2}], ref=parsed), expected='x,y\r\nint,str\r\n2,b\r\n')
+
+
+class TestColumns:
+    def test_parse_lists_and_arrays(self) -> None:
+        format_ = CSVFormat()
+        actual = format_.parse_columns('a,b,c,d\n1,1.5,foo,1\n2,2.5,bar,x\n', numpy=False)
+        compare(
+            actual,
+            expected={
+                'a': array('q', [1, 2]),
+                'b': array('d', [1.5, 2.5]),
+                'c': ['foo', 'bar'],
+                'd': [1, 'x'],
+            },
+        )
+
+    def test_parse_pretty(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        actual = pretty.parse_columns(
+            """
+            +-------+-----+
+            | x     | y   |
+            +-------+-----+
+            | float | str |
+            +-------+-----+
+            | 1     | 1   |
+            | 2     | 2   |
+            +-------+-----+
+            """,
+            numpy=False,
+        )
+        compare(actual, expected={'x': array('d', [1.0, 2.0]), 'y': ['1', '2']})
+
+    def test_parse_with_schema_and_inference(self) -> None:
+        format_ = CSVFormat(infer_types=1)
+        schema = Schema(('x', 'y'), (default_parse, str))
+        actual = format_.parse_columns(StringIO('x,y\n1,2\n3,4\n'), schema, numpy=False)
+        compare(actual, expected={'x': array('q', [1, 3]), 'y': ['2', '4']})
+
+    def test_parse_missing_cells(self) -> None:
+        actual = CSVFormat().parse_columns('x,y\n1\n2,3\n', numpy=False)
+        compare(actual, expected={'x': array('q', [1, 2]), 'y': [None, 3]})
+
+    def test_parse_no_rows(self) -> None:
+        compare(CSVFormat().parse_columns('x,y\n'), expected={'x': [], 'y': []})
+        compare(CSVFormat().parse_columns(''), expected={})
+
+    def test_parse_int_too_big_for_array(self) -> None:
+        actual = CSVFormat().parse_columns('x\n1\n100000000000000000000\n', numpy=False)
+        compare(actual, expected={'x': [1, 100000000000000000000]})
+
+    def test_parse_bools_not_arrays(self) -> None:
+        actual = CSVFormat().parse_columns('x\nTrue\nFalse\n', numpy=False)
+        compare(actual, expected={'x': [True, False]})
+
+    def test_parse_numpy(self) -> None:
+        numpy = pytest.importorskip('numpy')
+        actual = CSVFormat().parse_columns('a,b,c\n1,1.5,foo\n2,2.5,bar\n')
+        assert isinstance(actual['a'], numpy.ndarray)
+        compare(actual['a'].dtype, expected=numpy.dtype('int64'))
+        compare(actual['a'].tolist(), expected=[1, 2])
+        compare(actual['b'].dtype, expected=numpy.dtype('float64'))
+        compare(actual['b'].tolist(), expected=[1.5, 2.5])
+        compare(actual['c'], expected=['foo', 'bar'])
+
+    def test_parse_numpy_not_installed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+        _numpy.cache_clear()
+        try:
+            actual = CSVFormat().parse_columns('a,b\n1,1.5\n')
+        finally:
+            _numpy.cache_clear()
+        compare(actual, expected={'a': array('q', [1]), 'b': array('d', [1.5])})
+
+    def test_parse_value_error(self) -> None:
+        actual = CSVFormat(column_parse={'x': int}).parse_columns('x\n1\nfoo\n', numpy=False)
+        compare(actual, expected={'x': [1, 'foo']})
+
+    def test_render_csv(self) -> None:
+        format_ = CSVFormat(types_location=HEADER)
+        actual = format_.render_columns({'x': array('q', [1, 2]), 'y': ['foo', 'bar']})
+        compare(actual, expected='x (int),y (str)\r\n1,foo\r\n2,bar\r\n')
+
+    def test_render_pretty_round_trip(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        source = dedent("""\
+            +-------+-----+
+            | x     | y   |
+            +-------+-----+
+            | float | str |
+            +-------+-----+
+            | 1.5   | a   |
+            | 2.0   | b   |
+            +-------+-----+
+            """)
+        compare(pretty.render_columns(pretty.parse_columns(source)), expected=source)
+
+    def test_render_with_reference(self) -> None:
+        pretty = PrettyFormat()
+        actual = pretty.render_columns({'x': [1]}, ref=[{'y': 'foo', 'x': 0}])
+        compare(
+            actual,
+            expected=dedent("""\
+            +------+---+
+            | y    | x |
+            +------+---+
+            | None | 1 |
+            +------+---+
+            """),
+        )
+
+    def test_render_numpy(self) -> None:
+        numpy = pytest.importorskip('numpy')
+        format_ = CSVFormat(types_location=HEADER)
+        actual = format_.render_columns({'x': numpy.array([1, 2]), 'y': numpy.array([0.5, 1.5])})
+        compare(actual, expected='x (int),y (float)\r\n1,0.5\r\n2,1.5\r\n')
+
+
+class TestParseCache:
+    text = dedent("""\
+        +---+-----+
+        | x | y   |
+        +---+-----+
+        | 1 | [1] |
+        +---+-----+
+        """)
+
+    def test_hit(self) -> None:
+        cache = ParseCache()
+        pretty = PrettyFormat(cache=cache)
+        first = pretty.parse(self.text)
+        second = pretty.parse(self.text)
+        compare(list(second), expected=[{'x': 1, 'y': [1]}])
+        compare(second.widths, expected={'x': 1, 'y': 3})
+        compare((cache.hits, cache.misses, len(cache)), expected=(1, 1, 1))
+        assert first is not second
+
+    def test_copy_on_read(self) -> None:
+        pretty = PrettyFormat(cache=ParseCache())
+        first = pretty.parse(self.text)
+        first[0]['x'] = 2
+        first.append({})
+        first.widths['x'] = 10
+        second = pretty.parse(self.text)
+        compare(list(second), expected=[{'x': 1, 'y': [1]}])
+        compare(second.widths, expected={'x': 1, 'y': 3})
+        assert type(second) is type(first)
+
+    def test_values_copied_on_read(self) -> None:
+        pretty = PrettyFormat(cache=ParseCache())
+        pretty.parse(self.text)[0]['y'].append(99)
+        pretty.parse(self.text, compact=True)[0]['y'].append(99)
+        pretty.parse(self.text, compact=True)[0]['y'].append(99)
+        compare(list(pretty.parse(self.text)), expected=[{'x': 1, 'y': [1]}])
+        compare(pretty.parse(self.text, compact=True)[0]['y'], expected=[1])
+
+    def test_shared_values_still_shared(self) -> None:
+        value = [1]
+        format_ = CSVFormat(
+            column_parse={'x': lambda text: value, 'y': lambda text: value}, cache=ParseCache()
+        )
+        format_.parse('x,y\n1,2\n')
+        row = format_.parse('x,y\n1,2\n')[0]
+        assert row['x'] is row['y']
+        assert row['x'] is not value
+
+    def test_unhashable_parser(self) -> None:
+        class Unhashable:
+            __hash__ = None  # type: ignore[assignment]
+
+            def __call__(self, text: str) -> str:
+                return text + '!'
+
+        cache = ParseCache()
+        format_ = CSVFormat(cache=cache, column_parse={'x': Unhashable()})
+        for _ in range(2):
+            compare(format_.parse('x\n1\n'), expected=[{'x': '1!'}])
+        compare((cache.hits, cache.misses, len(cache)), expected=(0, 0, 0))
+
+    def test_compact(self) -> None:
+        cache = ParseCache()
+        pretty = PrettyFormat(cache=cache)
+        rows = pretty.parse(self.text, compact=True)
+        compare(pretty.parse(self.text, compact=True), expected=rows)
+        compare(type(pretty.parse(self.text)[0]), expected=dict)
+        compare((cache.hits, cache.misses), expected=(1, 2))
+
+    def test_shared_between_formats(self) -> None:
+        cache = ParseCache()
+        PrettyFormat(cache=cache).parse(self.text)
+        PrettyFormat(cache=cache).parse(self.text)
+        PrettyFormat(cache=cache, padding=2).parse(self.text)
+        PrettyFormat(cache=cache, column_parse={'x': str}).parse(self.text)
+        CSVFormat(cache=cache).parse('x\n1\n')
+        CSVFormat(cache=cache).parse('x\n1\n')
+        compare((cache.hits, cache.misses), expected=(2, 4))
+
+    def test_config_changed(self) -> None:
+        cache = ParseCache()
+        format_ = CSVFormat(cache=cache)
+        compare(format_.parse('x\n1\n'), expected=[{'x': 1}])
+        format_.column_parse['x'] = str
+        compare(format_.parse('x\n1\n'), expected=[{'x': '1'}])
+        compare((cache.hits, cache.misses), expected=(0, 2))
+
+    def test_schema(self) -> None:
+        cache = ParseCache()
+        format_ = CSVFormat(cache=cache)
+        compare(format_.parse('x\n1\n', Schema(('x',), (str,))), expected=[{'x': '1'}])
+        compare(format_.parse('x\n1\n', Schema(('x',), (str,))), expected=[{'x': '1'}])
+        compare(format_.parse('x\n1\n', Schema(('x',), (float,))), expected=[{'x': 1.0}])
+        compare((cache.hits, cache.misses), expected=(1, 2))
+
+    def test_eviction(self) -> None:
+        cache = ParseCache(maxsize=2)
+        format_ = CSVFormat(cache=cache)
+        format_.parse('x\n1\n')
+        format_.parse('x\n2\n')
+        format_.parse('x\n1\n')
+        format_.parse('x\n3\n')
+        compare((len(cache), cache.evictions), expected=(2, 1))
+        format_.parse('x\n1\n')
+        format_.parse('x\n2\n')
+        compare((cache.hits, cache.misses, cache.evictions), expected=(2, 4, 2))
+
+    def test_clear(self) -> None:
+        cache = ParseCache()
+        format_ = CSVFormat(cache=cache)
+        format_.parse('x\n1\n')
+        cache.clear()
+        compare(len(cache), expected=0)
+        format_.parse('x\n1\n')
+        compare((cache.hits, cache.misses), expected=(0, 2))
+
+    def test_no_cache(self) -> None:
+        format_ = CSVFormat()
+        assert format_.cache is None
+        compare(format_.parse('x\n1\n'), expected=[{'x': 1}])
+
+
+def parse_date(text: str) -> date:
+    return datetime.strptime(text, '%Y-%m-%d').date()
+
+
+class Repeat:
+    def __init__(self, times: int) -> None:
+        self.times = times
+
+    def parse(self, text: str) -> str:
+        return text * self.times
+
+
+class TestDiskCache:
+    text = 'x,y\n1,2024-01-02\n'
+
+    def test_hit_across_instances(self, tmp_path: Path) -> None:
+        first = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=first, column_parse={'y': parse_date})
+        compare(format_.parse(self.text), expected=[{'x': 1, 'y': date(2024, 1, 2)}])
+        compare((first.hits, first.misses), expected=(0, 1))
+        compare(len(list(tmp_path.glob('*.pickle'))), expected=1)
+
+        second = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=second, column_parse={'y': parse_date})
+        compare(format_.parse(self.text), expected=[{'x': 1, 'y': date(2024, 1, 2)}])
+        compare((second.hits, second.misses), expected=(1, 0))
+
+    def test_pretty_compact(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        pretty = PrettyFormat(cache=cache)
+        text = '| x |\n+---+\n| 1 |\n'
+        first = pretty.parse(text, compact=True)
+        second = pretty.parse(text, compact=True)
+        compare(second, expected=first)
+        compare(second.widths, expected={'x': 1})
+        compare(type(second), expected=PrettyRows)
+        compare(cache.hits, expected=1)
+
+    def test_configuration_changed(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        CSVFormat(cache=cache).parse(self.text)
+        CSVFormat(cache=cache, types_location=HEADER).parse(self.text)
+        CSVFormat(cache=cache, column_parse={'y': str}).parse(self.text)
+        CSVFormat(cache=cache, column_parse={'y': lambda text: text}).parse(self.text)
+        CSVFormat(cache=cache, column_parse={'y': lambda text: text.upper()}).parse(self.text)
+        compare((cache.hits, cache.misses), expected=(0, 5))
+
+    def test_builtin_parsers(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=cache, column_parse={'x': int, 'y': date.fromisoformat})
+        for _ in range(2):
+            compare(format_.parse(self.text), expected=[{'x': 1, 'y': date(2024, 1, 2)}])
+        compare((cache.hits, cache.misses), expected=(1, 1))
+
+    def test_not_found_by_name(self, tmp_path: Path) -> None:
+        def nested(text: str) -> str:
+            return text + '?'
+
+        cache = DiskCache(tmp_path)
+        for parse, expected in (
+            (lambda text: text + '!', '3!'),
+            (nested, '3?'),
+            (Repeat(2).parse, '33'),
+            ('{}!'.format, '3!'),
+        ):
+            with ShouldRaise(TypeError):
+                cache.path(parse)
+            format_ = CSVFormat(cache=cache, column_parse={'a': parse})
+            for _ in range(2):
+                compare(format_.parse('a\n3\n'), expected=[{'a': expected}])
+        compare((cache.hits, cache.misses), expected=(0, 8))
+        compare(list(tmp_path.iterdir()), expected=[])
+        with ShouldRaise(TypeError):
+            cache.path(re.compile('3').fullmatch)
+
+    def test_source_changed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        source = tmp_path / 'chide_disk_cache_parsers.py'
+        source.write_text("MAPPING = {'a': 1}\ndef parse(text):\n    return MAPPING.get(text, text)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        module = import_module('chide_disk_cache_parsers')
+        monkeypatch.setitem(sys.modules, 'chide_disk_cache_parsers', module)
+        cache = DiskCache(tmp_path / 'cache')
+        compare(CSVFormat(cache=cache, column_parse={'x': module.parse}).parse('x\na\n'), expected=[{'x': 1}])
+
+        source.write_text("MAPPING = {'a': 22}\ndef parse(text):\n    return MAPPING.get(text, text)\n")
+        module = reload(module)
+        compare(
+            CSVFormat(cache=cache, column_parse={'x': module.parse}).parse('x\na\n'), expected=[{'x': 22}]
+        )
+        compare(
+            CSVFormat(cache=cache, column_parse={'x': module.parse}).parse('x\na\n'), expected=[{'x': 22}]
+        )
+        compare((cache.hits, cache.misses), expected=(1, 2))
+
+    def test_same_configuration(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        for _ in range(2):
+            CSVFormat(cache=cache, column_parse={'y': parse_date}).parse(self.text)
+        compare((cache.hits, cache.misses), expected=(1, 1))
+
+    def test_schema(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=cache)
+        for parsers in (int, parse_date), (int, parse_date), (int, str):
+            format_.parse(self.text, Schema(('x', 'y'), parsers))
+        compare((cache.hits, cache.misses), expected=(1, 2))
+
+    def test_module_without_source(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        module = ModuleType('chide_no_source')
+        exec('def parse(text):\n    return text\n', module.__dict__)
+        monkeypatch.setitem(sys.modules, 'chide_no_source', module)
+        cache = DiskCache(tmp_path)
+        with ShouldRaise(TypeError("No source file for module 'chide_no_source'")):
+            cache.path(module.parse)
+
+    def test_version_changed(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        CSVFormat(cache=cache).parse(self.text)
+        cache.versions += 'x'
+        CSVFormat(cache=cache).parse(self.text)
+        compare((cache.hits, cache.misses), expected=(0, 2))
+
+    def test_corrupt_file(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=cache)
+        format_.parse(self.text)
+        (path,) = tmp_path.glob('*.pickle')
+        path.write_bytes(b'rubbish')
+        compare(format_.parse(self.text), expected=[{'x': 1, 'y': '2024-01-02'}])
+        compare(format_.parse(self.text), expected=[{'x': 1, 'y': '2024-01-02'}])
+        compare((cache.hits, cache.misses), expected=(1, 2))
+
+    def test_missing_global(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=cache)
+        format_.parse(self.text)
+        (path,) = tmp_path.glob('*.pickle')
+        for data in b'cchide.formats\nNoSuchThing\n.', b'cno_such_module\nthing\n.':
+            path.write_bytes(data)
+            compare(format_.parse(self.text), expected=[{'x': 1, 'y': '2024-01-02'}])
+        compare((cache.hits, cache.misses), expected=(0, 3))
+
+    def test_unpicklable(self, tmp_path: Path) -> None:
+        class Local:
+            pass
+
+        cache = DiskCache(tmp_path)
+        format_ = CSVFormat(cache=cache, column_parse={'x': lambda text: Local()})
+        format_.parse(self.text)
+        compare(list(tmp_path.iterdir()), expected=[])
+
+    def test_clear(self, tmp_path: Path) -> None:
+        cache = DiskCache(tmp_path / 'cache')
+        CSVFormat(cache=cache).parse(self.text)
+        cache.clear()
+        compare(list((tmp_path / 'cache').iterdir()), expected=[])
+
+
+class TestParseParallel:
+    def test_csv(self) -> None:
+        text = 'x,y\n' + ''.join(f'{i},"a\nb{i}"\n' for i in range(10))
+        format_ = CSVFormat()
+        actual = format_.parse_parallel(text, workers=2, chunk_size=3)
+        compare(actual, expected=format_.parse(text))
+
+    def test_csv_types_and_schema(self) -> None:
+        format_ = CSVFormat(types_location=ROW)
+        text = 'x,y\nfloat,str\n1,2\n3,4\n5,6\n'
+        compare(
+            format_.parse_parallel(text, workers=2, chunk_size=1),
+            expected=[{'x': 1.0, 'y': '2'}, {'x': 3.0, 'y': '4'}, {'x': 5.0, 'y': '6'}],
+        )
+        schema = Schema(('x', 'y'), (str, parse_date))
+        compare(
+            format_.parse_parallel('x,y\nint,int\n1,2024-01-02\n3,2024-01-03\n', schema, chunk_size=1),
+            expected=[{'x': '1', 'y': date(2024, 1, 2)}, {'x': '3', 'y': date(2024, 1, 3)}],
+        )
+
+    def test_pretty(self) -> None:
+        pretty = PrettyFormat()
+        text = pretty.render([{'x': i, 'y': 'a' * i} for i in range(10)])
+        actual = pretty.parse_parallel(text, workers=2, chunk_size=4)
+        expected = pretty.parse(text)
+        compare(list(actual), expected=list(expected))
+        compare(actual.widths, expected=expected.widths)
+        compare(actual.widths, expected={'x': 1, 'y': 9})
+
+    def test_pretty_fixed_width(self) -> None:
+        pretty = PrettyFormat(fixed_width=True, types_location=HEADER)
+        text = pretty.render([{'x': i, 'y': f'a|{i}'} for i in range(5)])
+        actual = pretty.parse_parallel(text, chunk_size=2, compact=True)
+        compare(actual, expected=pretty.parse(text, compact=True))
+        compare(actual.widths, expected={'x': 7, 'y': 7})
+
+    def test_infer_types(self) -> None:
+        format_ = CSVFormat(infer_types=2)
+        text = 'x\n2024-01-01\n2024-01-02\n2024-01-03\nfoo\n'
+        compare(
+            format_.parse_parallel(text, chunk_size=1, compact=True),
+            expected=[(date(2024, 1, 1),), (date(2024, 1, 2),), (date(2024, 1, 3),), ('foo',)],
+        )
+
+    def test_chunks_read_as_needed(self) -> None:
+        read = []
+
+        def chunks() -> Iterator[list[Any]]:
+            for i in range(10):
+                read.append(i)
+                yield [[str(i)]]
+
+        seen = []
+        with ThreadPoolExecutor(2) as executor:
+            for rows, _ in _submit_chunks(executor, 4, chunks(), None, ('x',), (int,), False):
+                seen.append((rows, len(read)))
+        compare(
+            seen,
+            expected=[([{'x': i}], min(i + 5, 10)) for i in range(10)],
+        )
+
+    def test_single_chunk(self) -> None:
+        pretty = PrettyFormat()
+        actual = pretty.parse_parallel('| x |\n+---+\n| 1 |\n', workers=0)
+        compare(list(actual), expected=[{'x': 1}])
+        compare(actual.widths, expected={'x': 1})
+
+    def test_empty(self) -> None:
+        compare(CSVFormat().parse_parallel(''), expected=[])
+        compare(CSVFormat().parse_parallel('x\n'), expected=[])
+        compare(PrettyFormat().parse_parallel('').widths, expected={})
+
+    def test_file(self) -> None:
+        format_ = CSVFormat()
+        compare(format_.parse_parallel(StringIO('x\n1\n2\n'), chunk_size=1), expected=[{'x': 1}, {'x': 2}])
+
+
+class TestParsePath:
+    def test_pretty(self, tmp_path: Path) -> None:
+        path = tmp_path / 'table.txt'
+        path.write_text(
+            '    +---+------+\n    | x | y    |\n    +---+------+\n    | 1 | f\u00f6o  |\n    +---+------+\n'
+        )
+        pretty = PrettyFormat()
+        actual = pretty.parse_path(path)
+        compare(list(actual), expected=[{'x': 1, 'y': 'f\u00f6o'}])
+        compare(actual.widths, expected={'x': 1, 'y': 4})
+        compare(pretty.parse_path(str(path), compact=True), expected=[(1, 'f\u00f6o')])
+
+    def test_csv(self, tmp_path: Path) -> None:
+        path = tmp_path / 'table.csv'
+        path.write_bytes(b'x,y\r\n1,"a\r\nb"\r\n2,\xe9\r\n')
+        format_ = CSVFormat()
+        compare(
+            format_.parse_path(path, encoding='latin-1'),
+            expected=[{'x': 1, 'y': 'a\r\nb'}, {'x': 2, 'y': '\xe9'}],
+        )
+        compare(
+            format_.parse_path(path, encoding='latin-1', compact=True), expected=[(1, 'a\r\nb'), (2, '\xe9')]
+        )
+
+    def test_empty(self, tmp_path: Path) -> None:
+        path = tmp_path / 'empty.csv'
+        path.write_bytes(b'')
+        compare(CSVFormat().parse_path(path), expected=[])
+        compare(list(PrettyFormat().parse_path(path)), expected=[])
+
+    def test_no_trailing_newline(self, tmp_path: Path) -> None:
+        path = tmp_path / 'table.csv'
+        path.write_bytes(b'x\n1\n2')
+        compare(list(mapped_lines(path)), expected=['x\n', '1\n', '2'])
+
+    def test_path_as_source(self, tmp_path: Path) -> None:
+        path = tmp_path / 'table.csv'
+        path.write_bytes(b'x (float)\n1\n')
+        format_ = CSVFormat(types_location=HEADER)
+        compare(list(format_.iter_parse(path)), expected=[{'x': 1.0}])
+        compare(format_.schema(path), expected=Schema(('x',), (float,)))
+        compare(format_.parse_columns(path, numpy=False), expected={'x': array('d', [1.0])})
+
+
+class TestCompareTables:
+    def test_same(self) -> None:
+        diff = compare_tables([{'x': 1, 'y': [1]}], [{'y': [1], 'x': 1}])
+        assert not diff
+        compare(repr(diff), expected='<TableDiff: 0 added, 0 removed, 0 changed>')
+        compare(diff.render(), expected='')
+
+    def test_keyed(self) -> None:
+        expected = [{'id': 1, 'x': 'a'}, {'id': 2, 'x': 'b'}, {'id': 3, 'x': 'c'}]
+        actual = [{'id': 3, 'x': 'c'}, {'id': 2, 'x': 'B'}, {'id': 4, 'x': 'd'}]
+        diff = compare_tables(expected, actual, key='id')
+        assert diff
+        compare(repr(diff), expected='<TableDiff: 1 added, 1 removed, 1 changed>')
+        compare(diff.added, expected=[{'id': 4, 'x': 'd'}])
+        compare(diff.removed, expected=[{'id': 1, 'x': 'a'}])
+        (changed,) = diff.changed
+        compare(changed.expected, expected={'id': 2, 'x': 'b'})
+        compare(changed.actual, expected={'id': 2, 'x': 'B'})
+        compare(changed.cells, expected={'x': ('b', 'B')})
+        compare(
+            diff.render(),
+            expected=dedent("""\
+            +---+----+---+
+            |   | id | x |
+            +---+----+---+
+            | - | 1  | a |
+            | - | 2  | b |
+            | + | 2  | B |
+            | + | 4  | d |
+            +---+----+---+
+            """),
+        )
+
+    def test_composite_key_and_missing_cells(self) -> None:
+        expected: list[dict[str, Any]] = [{'a': 1, 'b': 1, 'x': None}, {'a': 1, 'b': 2, 'x': 'y'}]
+        actual = [{'a': 1, 'b': 1}, {'a': 1, 'b': 2, 'z': 3}]
+        diff = compare_tables(expected, actual, key=('a', 'b'))
+        compare(diff.columns, expected=['a', 'b', 'x', 'z'])
+        compare([row.cells for row in diff.changed], expected=[{'x': ('y', None), 'z': (None, 3)}])
+        compare((diff.added, diff.removed), expected=([], []))
+
+    def test_duplicate_key(self) -> None:
+        with ShouldRaise(ValueError("Duplicate key (1,) in expected table")):
+            compare_tables([{'id': 1}, {'id': 1}], [], key='id')
+        with ShouldRaise(ValueError("Duplicate key (1,) in actual table")):
+            compare_tables([], [{'id': 1}, {'id': 1}], key=['id'])
+
+    def test_unkeyed_multiset(self) -> None:
+        expected: list[dict[str, Any]] = [{'x': 1}, {'x': 1}, {'x': [2]}, {'x': 3}]
+        actual: list[dict[str, Any]] = [{'x': [2]}, {'x': 1}, {'x': 4}, {'x': 3}, {'x': 3}]
+        diff = compare_tables(expected, actual)
+        compare(diff.removed, expected=[{'x': 1}])
+        compare(diff.added, expected=[{'x': 4}, {'x': 3}])
+        compare(diff.changed, expected=[])
+
+    def test_unkeyed_types_differ(self) -> None:
+        for expected, actual in (
+            ([1], (1,)),
+            ({'a': 1}, frozenset({('a', 1)})),
+            ({1}, frozenset({1})),
+            ([[1]], [(1,)]),
+        ):
+            diff = compare_tables([{'x': expected}], [{'x': actual}])
+            compare(diff.removed, expected=[{'x': expected}])
+            compare(diff.added, expected=[{'x': actual}])
+
+    def test_unkeyed_unhashable_containers(self) -> None:
+        rows = [{'x': {'a': [1]}, 'y': {2}, 'z': [[3]]}]
+        assert not compare_tables(rows, [{'x': {'a': [1]}, 'y': {2}, 'z': [[3]]}])
+        diff = compare_tables(rows, [{'x': {'a': [2]}, 'y': {2}, 'z': [[3]]}])
+        compare((len(diff.removed), len(diff.added)), expected=(1, 1))
+
+    def test_unkeyed_unhashable_not_container(self) -> None:
+        class Unhashable:
+            __hash__ = None  # type: ignore[assignment]
+
+            def __repr__(self) -> str:
+                return '<Unhashable>'
+
+        with ShouldRaise(TypeError('Cannot compare unhashable value <Unhashable>')):
+            compare_tables([{'x': Unhashable()}], [{'x': Unhashable()}])
+
+    def test_row_diff_repr(self) -> None:
+        diff = compare_tables([{'id': 1, 'x': 'a'}], [{'id': 1, 'x': 'b'}], key='id')
+        compare(repr(diff.changed[0]), expected="<RowDiff: {'x': ('a', 'b')}>")
+
+    def test_compact_rows(self) -> None:
+        pretty = PrettyFormat()
+        text = """
+            +----+---+
+            | id | x |
+            +----+---+
+            | 1  | a |
+            +----+---+
+            """
+        diff = compare_tables(pretty.parse(text, compact=True), [{'id': 1, 'x': 'b'}], key='id')
+        compare([row.cells for row in diff.changed], expected=[{'x': ('a', 'b')}])
+
+    def test_render_with_context(self) -> None:
+        expected = [{'id': i, 'x': i} for i in range(10)]
+        actual = [{'id': i, 'x': 'changed' if i == 4 else i} for i in range(10)]
+        diff = compare_tables(expected, actual, key='id')
+        compare(
+            diff.render(context=1),
+            expected=dedent("""\
+            +---+----+---------+
+            |   | id | x       |
+            +---+----+---------+
+            |   | 3  | 3       |
+            | - | 4  | 4       |
+            | + | 4  | changed |
+            |   | 5  | 5       |
+            +---+----+---------+
+            """),
+        )
+
+    def test_render_with_format(self) -> None:
+        diff = compare_tables([{'x': 1}], [{'x': 2}])
+        compare(diff.render(PrettyFormat(padding=0)), expected='+-+-+\n| |x|\n+-+-+\n|-|1|\n|+|2|\n+-+-+\n')
+
+    def test_large(self) -> None:
+        expected = [{'id': i, 'x': i} for i in range(100_000)]
+        actual = [{'id': i, 'x': i} for i in range(1, 100_001)]
+        diff = compare_tables(expected, actual, key='id')
+        compare((diff.removed, diff.added), expected=([{'id': 0, 'x': 0}], [{'id': 100_000, 'x': 100_000}]))
+        compare(len(diff.render().splitlines()), expected=6)
+
+
+class TestRenderTruncated:
+    def test_head_and_tail(self) -> None:
+        attrs = ({'x': i, 'y': 'a' * (i % 7)} for i in range(1000))
+        compare(
+            PrettyFormat().render_truncated(attrs, head=2, tail=2),
+            expected=dedent("""\
+            +-----+------------------+
+            | x   | y                |
+            +-----+------------------+
+            | 0   |                  |
+            | 1   | a                |
+            |... 996 rows omitted ...|
+            | 998 | aaaa             |
+            | 999 | aaaaa            |
+            +-----+------------------+
+            """),
+        )
+
+    def test_single_row_omitted(self) -> None:
+        attrs = ({'x': i} for i in range(3))
+        compare(
+            PrettyFormat(padding=0).render_truncated(attrs, head=1, tail=1),
+            expected=dedent("""\
+            +---------------------+
+            |x                    |
+            +---------------------+
+            |0                    |
+            |... 1 row omitted ...|
+            |2                    |
+            +---------------------+
+            """),
+        )
+
+    def test_nothing_omitted(self) -> None:
+        pretty = PrettyFormat()
+        attrs = [{'x': i} for i in range(4)]
+        compare(pretty.render_truncated(iter(attrs), head=2, tail=2), expected=pretty.render(attrs))
+
+    def test_no_head(self) -> None:
+        attrs = ({'x': i} for i in range(5))
+        compare(
+            PrettyFormat().render_truncated(attrs, head=0, tail=1),
+            expected=dedent("""\
+            +----------------------+
+            | x                    |
+            +----------------------+
+            |... 4 rows omitted ...|
+            | 4                    |
+            +----------------------+
+            """),
+        )
+
+    def test_no_head_omitted_row_not_measured(self) -> None:
+        attrs = ({'x': 'a' * 50 if i == 0 else i} for i in range(100))
+        compare(
+            PrettyFormat().render_truncated(attrs, head=0, tail=2),
+            expected=dedent("""\
+            +-----------------------+
+            | x                     |
+            +-----------------------+
+            |... 98 rows omitted ...|
+            | 98                    |
+            | 99                    |
+            +-----------------------+
+            """),
+        )
+
+    def test_ref(self) -> None:
+        pretty = PrettyFormat(types_location=ROW)
+        attrs = ({'x': i, 'y': 'foo'} for i in range(5))
+        compare(
+            pretty.render_truncated(attrs, [{'y': '', 'x': 0}], head=1, tail=1),
+            expected=dedent("""\
+            +-----+----------------+
+            | y   | x              |
+            +-----+----------------+
+            | str | int            |
+            +-----+----------------+
+            | foo | 0              |
+            |... 3 rows omitted ...|
+            | foo | 4              |
+            +-----+----------------+
+            """),
+        )
+
+    def test_empty(self) -> None:
+        compare(PrettyFormat().render_truncated([]), expected='+\n+\n')
+
+    def test_max_size(self) -> None:
+        attrs = ({'x': i} for i in range(100))
+        text = PrettyFormat().render_truncated(attrs, head=50, tail=50, max_size=60)
+        compare(
+            text,
+            expected=dedent("""\
+            +----+
+            | x  |
+            +----+
+            ... truncated to 60 characters ...
+            """),
+        )
+        assert len(text) <= 60
+
+    def test_max_size_smaller_than_note(self) -> None:
+        attrs = [{'x': i} for i in range(100)]
+        compare(PrettyFormat().render_truncated(attrs, max_size=10), expected='... trunca')
+        compare(PrettyFormat().render_truncated(attrs, max_size=0), expected='')
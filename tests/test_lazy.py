@@ -0,0 +1,132 @@
+from copy import copy, deepcopy
+from dataclasses import dataclass, asdict
+from pickle import dumps, loads
+from typing import Any
+
+from testfixtures import compare, ShouldRaise
+
+from chide import Collection, nest
+from chide.lazy import LazyProxy, resolve
+from .helpers import Comparable
+
+
+class Sample(Comparable):
+    def __init__(self, x: Any) -> None:
+        self.x = x
+
+
+class Factory:
+    def __init__(self, obj: Any) -> None:
+        self.obj = obj
+        self.calls = 0
+
+    def __call__(self) -> Any:
+        self.calls += 1
+        return self.obj
+
+
+@dataclass
+class Inner:
+    a: int
+
+
+@dataclass
+class Outer:
+    x: int
+    inner: Inner
+
+
+class TestLazyProxy:
+    def test_not_made_until_used(self) -> None:
+        factory = Factory(Sample(1))
+        proxy = LazyProxy(factory)
+        compare(factory.calls, expected=0)
+        compare(proxy.x, expected=1)
+        compare(proxy.x, expected=1)
+        compare(factory.calls, expected=1)
+
+    def test_set_and_delete_attributes(self) -> None:
+        sample = Sample(1)
+        proxy = LazyProxy(Factory(sample))
+        proxy.x = 2
+        compare(sample.x, expected=2)
+        del proxy.x
+        assert not hasattr(sample, 'x')
+
+    def test_isinstance(self) -> None:
+        proxy = LazyProxy(Factory(Sample(1)))
+        assert isinstance(proxy, Sample)
+        assert isinstance(proxy, LazyProxy)
+        assert type(proxy) is LazyProxy
+
+    def test_comparison_and_hashing(self) -> None:
+        proxy = LazyProxy(Factory('foo'))
+        assert proxy == 'foo'
+        assert 'foo' == proxy
+        assert proxy != 'bar'
+        assert proxy == LazyProxy(Factory('foo'))
+        compare(hash(proxy), expected=hash('foo'))
+
+    def test_repr_and_str(self) -> None:
+        proxy = LazyProxy(Factory(Sample(1)))
+        compare(repr(proxy), expected='<Sample: x=1>')
+        compare(str(proxy), expected='<Sample: x=1>')
+
+    def test_container(self) -> None:
+        obj = {'a': 1}
+        proxy = LazyProxy(Factory(obj))
+        assert proxy
+        compare(len(proxy), expected=1)
+        compare(list(proxy), expected=['a'])
+        assert 'a' in proxy
+        compare(proxy['a'], expected=1)
+        proxy['b'] = 2
+        del proxy['a']
+        compare(obj, expected={'b': 2})
+
+    def test_exception_from_factory(self) -> None:
+        proxy = LazyProxy(lambda: 1 / 0)
+        with ShouldRaise(ZeroDivisionError):
+            proxy.x
+
+    def test_resolve(self) -> None:
+        sample = Sample(1)
+        proxy: Any = LazyProxy(Factory(sample))
+        assert resolve(proxy) is sample
+        assert resolve(sample) is sample
+
+    def test_copy(self) -> None:
+        sample = Sample(1)
+        copied: Any = copy(LazyProxy(Factory(sample)))
+        assert type(copied) is Sample
+        assert copied is not sample
+        compare(copied, expected=Sample(1))
+
+    def test_deepcopy(self) -> None:
+        sample = Sample([1])
+        copied: Any = deepcopy(LazyProxy(Factory(sample)))
+        assert type(copied) is Sample
+        assert copied.x is not sample.x
+        compare(copied, expected=Sample([1]))
+
+    def test_pickle(self) -> None:
+        unpickled: Any = loads(dumps(LazyProxy(Factory(Sample(1)))))
+        assert type(unpickled) is Sample
+        compare(unpickled, expected=Sample(1))
+
+    def test_not_initialised(self) -> None:
+        proxy: Any = LazyProxy.__new__(LazyProxy)
+        with ShouldRaise(AttributeError('_obj')):
+            proxy.x
+
+    def test_nested_sample(self) -> None:
+        collection = Collection({Outer: {'x': 1, 'inner': nest(Inner, lazy=True)}, Inner: {'a': 2}})
+        sample = collection.make(Outer)
+        inner: Any = sample.inner
+        assert type(inner) is LazyProxy
+        for copied in copy(sample), deepcopy(sample), loads(dumps(sample)):
+            compare(copied, expected=Outer(1, Inner(2)))
+        assert type(deepcopy(sample).inner) is Inner
+        assert type(loads(dumps(sample)).inner) is Inner
+        # asdict only sees the proxy, so the sample object is copied rather than converted:
+        compare(asdict(sample), expected={'x': 1, 'inner': Inner(2)})
@@ -1,9 +1,11 @@
+import gc
 from typing import Type, Any
 from unittest import TestCase
 
 from testfixtures import compare, ShouldRaise, ShouldAssert
 
-from chide import Collection, Set
+from chide import Collection, Set, call, nest
+from chide.set import LRUObjects, WeakObjects
 from chide.typing import Attrs
 
 
@@ -82,3 +84,289 @@ class TestSet(TestCase):
         compare(obj4, expected={'x': None})
         self.assertTrue(obj1 is obj2)
         self.assertFalse(obj3 is obj4)
+
+    def test_identified_by_skips_resolution_on_hit(self) -> None:
+        calls = []
+
+        def factory() -> int:
+            calls.append(1)
+            return len(calls)
+
+        collection = Collection({dict: {'x': 1, 'y': call(factory)}})
+
+        def identify(type_: Type[Any], attrs: Attrs) -> int:
+            compare(attrs, expected={'x': attrs['x']})
+            key = attrs['x']
+            assert isinstance(key, int)
+            return key
+
+        samples = Set(collection, identify, identified_by=lambda type_: ['x'])
+        obj1 = samples.get(dict)
+        obj2 = samples.get(dict)
+        obj3 = samples.get(dict, x=2)
+        assert obj1 is obj2
+        compare(obj1, expected={'x': 1, 'y': 1})
+        compare(obj3, expected={'x': 2, 'y': 2})
+        compare(len(calls), expected=2)
+
+    def test_identified_by_resolves_identity_once(self) -> None:
+        counter = iter(range(100))
+        collection = Collection({dict: {'x': call(counter.__next__), 'y': 0}})
+
+        def identify(type_: Type[Any], attrs: Attrs) -> int:
+            key = attrs['x']
+            assert isinstance(key, int)
+            return key
+
+        samples = Set(collection, identify, identified_by=lambda type_: ['x'])
+        compare(samples.get(dict), expected={'x': 0, 'y': 0})
+        compare(samples.get(dict), expected={'x': 1, 'y': 0})
+
+    def test_identified_by_missing_attribute(self) -> None:
+        def identify(type_: Type[Any], attrs: Attrs) -> int | None:
+            compare(attrs, expected={})
+            return None
+
+        samples = Set(self.collection, identify, identified_by=lambda type_: ['x'])
+        obj1 = samples.get(dict, y=1)
+        obj2 = samples.get(dict, y=1)
+        compare(obj1, expected={'y': 1})
+        assert obj1 is not obj2
+
+    def test_identified_by_nested(self) -> None:
+        collection = Collection({dict: {'x': 1, 'child': nest(list)}, list: {}})
+
+        def identify(type_: Type[Any], attrs: Attrs) -> int | None:
+            if type_ is dict:
+                key = attrs['x']
+                assert isinstance(key, int)
+                return key
+            raise AssertionError('child should not be made')
+
+        samples = Set(collection, identify, identified_by=lambda type_: ['x'])
+        samples.objects[1] = {'x': 1}
+        compare(samples.get(dict), expected={'x': 1})
+
+    def test_identified_by_subclass(self) -> None:
+        class MySet(Set):
+            def identify(self, type_: Type[Any], attrs: Attrs) -> int:
+                key = attrs['x']
+                assert isinstance(key, int)
+                return key
+
+            def identified_by(self, type_: Type[Any]) -> list[str]:
+                return ['x']
+
+        samples = MySet(Collection({dict: {'x': 1, 'y': call(lambda: 1 / 0)}}))
+        obj: dict[str, int] = {}
+        samples.objects[1] = obj
+        assert samples.get(dict) is obj
+
+
+class Sample:
+    def __init__(self, x: int) -> None:
+        self.x = x
+
+
+def identify_x(type_: Type[Any], attrs: Attrs) -> int:
+    key = attrs['x']
+    assert isinstance(key, int)
+    return key
+
+
+class TestLRUObjects(TestCase):
+    def test_eviction(self) -> None:
+        objects = LRUObjects(maxsize=2)
+        samples = Set(Collection({Sample: {}}), identify_x, objects=objects)
+        obj1 = samples.get(Sample, x=1)
+        obj2 = samples.get(Sample, x=2)
+        # use 1 so that 2 is least recently used:
+        assert samples.get(Sample, x=1) is obj1
+        samples.get(Sample, x=3)
+        compare(list(objects), expected=[1, 3])
+        compare(objects.evictions, expected=1)
+        assert samples.get(Sample, x=1) is obj1
+        assert samples.get(Sample, x=2) is not obj2
+        compare(objects.evictions, expected=2)
+        compare(len(objects), expected=2)
+
+    def test_delete(self) -> None:
+        objects = LRUObjects(maxsize=2)
+        objects[1] = 'a'
+        del objects[1]
+        compare(dict(objects), expected={})
+        compare(objects.evictions, expected=0)
+
+
+class TestWeakObjects(TestCase):
+    def test_eviction(self) -> None:
+        objects = WeakObjects()
+        samples = Set(Collection({Sample: {}}), identify_x, objects=objects)
+        obj1 = samples.get(Sample, x=1)
+        samples.get(Sample, x=2)
+        gc.collect()
+        compare(list(objects), expected=[1])
+        compare(objects.evictions, expected=1)
+        assert samples.get(Sample, x=1) is obj1
+        compare(objects.evictions, expected=1)
+
+    def test_replace_and_delete(self) -> None:
+        objects = WeakObjects()
+        obj1, obj2 = Sample(1), Sample(2)
+        objects[1] = obj1
+        objects[1] = obj2
+        del obj1
+        gc.collect()
+        assert objects[1] is obj2
+        compare(objects.evictions, expected=0)
+        del objects[1]
+        compare(len(objects), expected=0)
+        with ShouldRaise(KeyError(1)):
+            objects[1]
+
+    def test_dead_before_evicted(self) -> None:
+        # objects in a reference cycle are all dead before any are evicted:
+        class Node:
+            other: 'Node'
+
+        objects = WeakObjects()
+        obj1, obj2 = Node(), Node()
+        obj1.other, obj2.other = obj2, obj1
+        objects[1], objects[2] = obj1, obj2
+        seen = []
+
+        def on_evict(key: Any) -> None:
+            seen.append((key, objects.get(3 - key)))
+
+        objects.on_evict = on_evict
+        del obj1, obj2
+        gc.collect()
+        compare(sorted(seen), expected=[(1, None), (2, None)])
+        compare(len(objects), expected=0)
+
+    def test_not_weakly_referenceable(self) -> None:
+        samples = Set(Collection({dict: {}}), identify_x, objects=WeakObjects())
+        with ShouldRaise(TypeError):
+            samples.get(dict, x=1)
+
+
+class Order:
+    def __init__(self, id: int, customer: str, status: str) -> None:
+        self.id, self.customer, self.status = id, customer, status
+
+
+def identify_id(type_: Type[Any], attrs: Attrs) -> int | None:
+    key = attrs['id']
+    assert key is None or isinstance(key, int)
+    return key
+
+
+class TestQueries(TestCase):
+    def make_set(self, objects: Any = None) -> Set:
+        collection = Collection({Order: {'id': None, 'customer': 'x', 'status': 'open'}})
+        return Set(
+            collection, identify_id, objects=objects, indexes={Order: ['customer', ('customer', 'status')]}
+        )
+
+    def test_find(self) -> None:
+        samples = self.make_set()
+        order1 = samples.get(Order, id=1, customer='a')
+        order2 = samples.get(Order, id=2, customer='b')
+        order3 = samples.get(Order, id=3, customer='a', status='closed')
+        compare(samples.find(Order, customer='a'), expected=[order1, order3])
+        compare(samples.find(Order, customer='b'), expected=[order2])
+        compare(samples.find(Order, customer='c'), expected=[])
+        compare(samples.find(Order, status='closed', customer='a'), expected=[order3])
+
+    def test_find_existing_not_reindexed(self) -> None:
+        samples = self.make_set()
+        order = samples.get(Order, id=1, customer='a')
+        assert samples.get(Order, id=1, customer='b') is order
+        compare(samples.find(Order, customer='a'), expected=[order])
+        compare(samples.find(Order, customer='b'), expected=[])
+
+    def test_find_no_identity_not_indexed(self) -> None:
+        samples = self.make_set()
+        samples.get(Order, customer='a')
+        compare(samples.find(Order, customer='a'), expected=[])
+
+    def test_find_no_index(self) -> None:
+        samples = self.make_set()
+        with ShouldRaise(ValueError(f"No index for {Order!r} on 'id', 'status'")):
+            samples.find(Order, status='open', id=1)
+        with ShouldRaise(ValueError(f"No index for {dict!r} on 'x'")):
+            samples.find(dict, x=1)
+
+    def test_all(self) -> None:
+        samples = self.make_set()
+        compare(samples.all(Order), expected=[])
+        order2 = samples.get(Order, id=2)
+        order1 = samples.get(Order, id=1)
+        compare(samples.all(Order), expected=[order2, order1])
+
+    def test_clear(self) -> None:
+        samples = self.make_set()
+        order1 = samples.get(Order, id=1, customer='a')
+        samples.clear(Order)
+        compare(samples.all(Order), expected=[])
+        compare(samples.find(Order, customer='a'), expected=[])
+        compare(dict(samples.objects), expected={})
+        order2 = samples.get(Order, id=1, customer='a')
+        assert order2 is not order1
+        compare(samples.find(Order, customer='a'), expected=[order2])
+
+    def test_clear_other_types_untouched(self) -> None:
+        samples = self.make_set()
+        samples.collection.mapping[dict] = {}
+        obj = samples.get(dict, id=10)
+        samples.get(Order, id=1)
+        samples.clear(Order)
+        compare(samples.all(dict), expected=[obj])
+
+    def test_evicted(self) -> None:
+        objects = LRUObjects(maxsize=1)
+        samples = self.make_set(objects)
+        samples.get(Order, id=1, customer='a')
+        order2 = samples.get(Order, id=2, customer='a')
+        compare(samples.find(Order, customer='a'), expected=[order2])
+        compare(samples.all(Order), expected=[order2])
+        order1 = samples.get(Order, id=1, customer='b')
+        compare(samples.find(Order, customer='a'), expected=[])
+        compare(samples.find(Order, customer='b'), expected=[order1])
+
+    def test_removed_from_storage_without_on_evict(self) -> None:
+        samples = self.make_set()
+        samples.get(Order, id=1, customer='a')
+        order2 = samples.get(Order, id=2, customer='a')
+        del samples.objects[1]
+        compare(samples.find(Order, customer='a'), expected=[order2])
+        compare(samples.all(Order), expected=[order2])
+        compare(list(samples._keys[Order]), expected=[2])
+
+    def test_evicted_forgotten(self) -> None:
+        objects = LRUObjects(maxsize=2)
+        samples = self.make_set(objects)
+        for id_ in range(1000):
+            samples.get(Order, id=id_, customer=f'c{id_}')
+        compare(len(objects), expected=2)
+        compare(list(samples._keys[Order]), expected=[998, 999])
+        for index in samples._indexes[Order].values():
+            compare(sorted(index.values), expected=[998, 999])
+            compare(len(index.keys), expected=2)
+
+    def test_weakly_evicted_forgotten(self) -> None:
+        samples = self.make_set(WeakObjects())
+        order = samples.get(Order, id=1, customer='a')
+        for id_ in range(2, 100):
+            samples.get(Order, id=id_, customer='a')
+        gc.collect()
+        compare(list(samples._keys[Order]), expected=[1])
+        for index in samples._indexes[Order].values():
+            compare(list(index.values), expected=[1])
+        compare(samples.find(Order, customer='a'), expected=[order])
+
+    def test_evicted_straight_away(self) -> None:
+        samples = self.make_set(LRUObjects(maxsize=0))
+        samples.get(Order, id=1, customer='a')
+        compare(samples._keys, expected={Order: {}})
+        compare(samples.find(Order, customer='a'), expected=[])
@@ -1,3 +1,5 @@
+import gc
+import weakref
 from typing import Type
 from unittest import TestCase
 
@@ -14,7 +16,7 @@ from sqlalchemy.orm import (
 )
 from testfixtures import compare, ShouldRaise
 
-from chide import Collection, nest
+from chide import Collection, nest, call
 from chide.sqlalchemy import Set
 from .helpers import Comparable
 
@@ -124,6 +126,57 @@ class TestSQLAlchemyCollection(TestCase):
         model = session.query(Child).one()
         compare(Child(id=3, value='Foo'), actual=model)
 
+    def test_existing_primary_key_does_not_make_nested(self) -> None:
+        class Base(DeclarativeBase):
+            pass
+
+        class Parent(Comparable, Base):
+            __tablename__ = 'parent'
+            id = Column(Integer, primary_key=True)
+            child_id = Column(Integer, ForeignKey('child.id'))
+            child = relationship('Child')
+
+        class Child(Comparable, Base):
+            __tablename__ = 'child'
+            id = Column(Integer, primary_key=True)
+            value = Column(String)
+
+        collection = Collection({Parent: {'id': 1, 'child': nest(Child)}, Child: {'id': 3, 'value': 'Foo'}})
+        samples = Set(collection)
+        parent = samples.get(Parent)
+        collection.mapping[Child] = {'id': call(lambda: 1 / 0)}
+        assert samples.get(Parent) is parent
+        compare(parent.child, expected=Child(id=3, value='Foo'))
+
+    def test_identify_composite_primary_key(self) -> None:
+        class Base(DeclarativeBase):
+            pass
+
+        class Composite(Base):
+            __tablename__ = 'composite'
+            first: Mapped[int] = mapped_column('first_', primary_key=True)
+            second: Mapped[str] = mapped_column(primary_key=True)
+            value: Mapped[str]
+
+        compare(Set.identified_by(Composite), expected=('first', 'second'))
+        compare(Set.identify(Composite, {'first': 1, 'second': 'a'}), expected=(Composite, 1, 'a'))
+        compare(Set.identify(Composite, {'first': 1, 'second': None}), expected=None)
+        compare(Set.identify(Composite, {'second': 'a'}), expected=None)
+
+    def test_primary_keys_not_kept_alive(self) -> None:
+        class Base(DeclarativeBase):
+            pass
+
+        class Temporary(Base):
+            __tablename__ = 'temporary'
+            id: Mapped[int] = mapped_column(primary_key=True)
+
+        compare(Set.identified_by(Temporary), expected=('id',))
+        ref = weakref.ref(Temporary)
+        del Base, Temporary
+        gc.collect()
+        compare(ref(), expected=None)
+
     def test_null_primary_key(self) -> None:
         Model, _, session = self.make_all()
 